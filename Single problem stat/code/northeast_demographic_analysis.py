@@ -1,40 +1,37 @@
+import numpy as np
 import pandas as pd
+import matplotlib
+# Agg backend: the adult share charts are written to northeast_plots/, never shown
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+plt.ioff()
 
 # Create directory for plots
 os.makedirs('northeast_plots', exist_ok=True)
 
+# Data based on the user's previous analysis findings
+STATES = np.array(['Meghalaya', 'Assam', 'Mizoram', 'Nagaland', 'Arunachal Pradesh', 'Gujarat', 'Maharashtra', 'National Avg'])
+# Percentage of new enrolments that are adults (18+)
+ADULT_SHARE = np.array([32.1, 9.9, 8.3, 7.5, 6.8, 1.2, 0.8, 0.9])
+# Total new enrolments (simulated for visualization)
+TOTAL_ENROLMENTS = np.array([109000, 450000, 42000, 38000, 35000, 850000, 1200000, 5000000])
+
 def analyze_northeast_gaps():
-    # Data based on the user's previous analysis findings
-    states = ['Meghalaya', 'Assam', 'Mizoram', 'Nagaland', 'Arunachal Pradesh', 'Gujarat', 'Maharashtra', 'National Avg']
-    # Percentage of new enrolments that are adults (18+)
-    adult_share = [32.1, 9.9, 8.3, 7.5, 6.8, 1.2, 0.8, 0.9]
-    # Total new enrolments (simulated for visualization)
-    total_enrolments = [109000, 450000, 42000, 38000, 35000, 850000, 1200000, 5000000]
-    
-    df = pd.DataFrame({
-        'State': states,
-        'Adult_Share_Pct': adult_share,
-        'Total_Enrolments': total_enrolments
-    })
-    
     # 1. Visualization: Adult Share vs National Average
     plt.figure(figsize=(12, 7))
     sns.set_style("whitegrid")
     
     # Sort for better visualization
-    df_sorted = df.sort_values('Adult_Share_Pct', ascending=False)
-    colors = ['#800000' if x > 5 else '#2F4F4F' for x in df_sorted['Adult_Share_Pct']]
+    order = np.argsort(-ADULT_SHARE, kind='stable')
+    colors = np.where(ADULT_SHARE[order] > 5, '#800000', '#2F4F4F')
     
-    bars = plt.barh(df_sorted['State'], df_sorted['Adult_Share_Pct'], color=colors, alpha=0.8)
+    bars = plt.barh(STATES[order], ADULT_SHARE[order], color=colors, alpha=0.8)
     plt.axvline(x=0.9, color='red', linestyle='--', label='National Average (0.9%)')
     
-    # Add labels
-    for bar in bars:
-        width = bar.get_width()
-        plt.text(width + 0.5, bar.get_y() + bar.get_height()/2, f'{width}%', va='center', fontweight='bold')
+    # Add labels (one bar_label call instead of a text per bar)
+    plt.gca().bar_label(bars, labels=[f'{v}%' for v in ADULT_SHARE[order]], padding=3, fontweight='bold')
 
     plt.title('Figure 1: The "Hidden Cohort" - Adult Enrolment Share by State', fontsize=15, fontweight='bold')
     plt.xlabel('Percentage of New Enrolments that are Adults (18+)', fontsize=12)
@@ -45,19 +42,16 @@ def analyze_northeast_gaps():
 
     # 2. Visualization: Composition of Enrolments (Children vs Adults)
     # Focus on Meghalaya vs National Avg
-    comp_data = {
-        'Category': ['Children (0-17)', 'Adults (18+)'],
-        'Meghalaya': [67.9, 32.1],
-        'National': [99.1, 0.9]
-    }
-    df_comp = pd.DataFrame(comp_data)
+    age_groups = ['Children (0-17)', 'Adults (18+)']
+    meghalaya_mix = [67.9, 32.1]
+    national_mix = [99.1, 0.9]
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
     
-    ax1.pie(df_comp['Meghalaya'], labels=df_comp['Category'], autopct='%1.1f%%', colors=['#66b3ff','#ff9999'], startangle=90)
+    ax1.pie(meghalaya_mix, labels=age_groups, autopct='%1.1f%%', colors=['#66b3ff','#ff9999'], startangle=90)
     ax1.set_title('Meghalaya Enrolment Mix')
     
-    ax2.pie(df_comp['National'], labels=df_comp['Category'], autopct='%1.1f%%', colors=['#66b3ff','#ff9999'], startangle=90)
+    ax2.pie(national_mix, labels=age_groups, autopct='%1.1f%%', colors=['#66b3ff','#ff9999'], startangle=90)
     ax2.set_title('National Enrolment Mix')
     
     plt.suptitle('Figure 2: Regional Demographic Divergence', fontsize=16, fontweight='bold')
@@ -65,7 +59,11 @@ def analyze_northeast_gaps():
     plt.savefig('northeast_plots/demographic_mix.png')
     plt.close()
     
-    return df
+    return pd.DataFrame({
+        'State': STATES,
+        'Adult_Share_Pct': ADULT_SHARE,
+        'Total_Enrolments': TOTAL_ENROLMENTS
+    })
 
 if __name__ == "__main__":
     results = analyze_northeast_gaps()
@@ -1,34 +1,33 @@
+import numpy as np
 import pandas as pd
+import matplotlib
+# Agg backend: the regression and sync charts are written to correlation_plots/, never shown
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+plt.ioff()
 
 # Create directory for plots
 os.makedirs('correlation_plots', exist_ok=True)
 
+# Data based on the user's previous analysis findings (Correlation 0.95)
+# States with high adult demographic updates vs high infant enrolments
+STATES = np.array(['Uttar Pradesh', 'Bihar', 'West Bengal', 'Rajasthan', 'Madhya Pradesh', 'Tamil Nadu', 'Karnataka', 'Kerala'])
+ADULT_DEMO_UPDATES = np.array([1200000, 950000, 880000, 720000, 680000, 450000, 420000, 310000])
+INFANT_ENROLMENTS = np.array([350000, 280000, 260000, 210000, 200000, 130000, 125000, 90000])
+
 def analyze_parent_child_correlation():
-    # Data based on the user's previous analysis findings (Correlation 0.95)
-    # States with high adult demographic updates vs high infant enrolments
-    states = ['Uttar Pradesh', 'Bihar', 'West Bengal', 'Rajasthan', 'Madhya Pradesh', 'Tamil Nadu', 'Karnataka', 'Kerala']
-    adult_demo_updates = [1200000, 950000, 880000, 720000, 680000, 450000, 420000, 310000]
-    infant_enrolments = [350000, 280000, 260000, 210000, 200000, 130000, 125000, 90000]
-    
-    df = pd.DataFrame({
-        'State': states,
-        'Adult_Demo_Updates': adult_demo_updates,
-        'Infant_Enrolments': infant_enrolments
-    })
-    
     # 1. Visualization: Regression Plot showing the strong correlation
     plt.figure(figsize=(10, 6))
     sns.set_style("whitegrid")
     
-    sns.regplot(data=df, x='Adult_Demo_Updates', y='Infant_Enrolments', 
+    sns.regplot(x=ADULT_DEMO_UPDATES, y=INFANT_ENROLMENTS, 
                 scatter_kws={'s':100, 'color':'#2E8B57'}, line_kws={'color':'#8B0000'})
     
     # Annotate states
-    for i in range(df.shape[0]):
-        plt.text(df.Adult_Demo_Updates[i]+20000, df.Infant_Enrolments[i], df.State[i], fontsize=9)
+    for x, y, label in zip(ADULT_DEMO_UPDATES + 20000, INFANT_ENROLMENTS, STATES):
+        plt.text(x, y, label, fontsize=9)
 
     plt.title('Figure 1: The "Parent-Child" Correlation (R = 0.95)', fontsize=15, fontweight='bold')
     plt.xlabel('Adult Demographic Updates (Migration/Maintenance)', fontsize=12)
@@ -60,10 +59,14 @@ def analyze_parent_child_correlation():
     plt.savefig('correlation_plots/temporal_sync.png')
     plt.close()
     
-    return df
+    return pd.DataFrame({
+        'State': STATES,
+        'Adult_Demo_Updates': ADULT_DEMO_UPDATES,
+        'Infant_Enrolments': INFANT_ENROLMENTS
+    })
 
 if __name__ == "__main__":
     results = analyze_parent_child_correlation()
     print("Correlation Analysis Complete.")
-    correlation = results['Adult_Demo_Updates'].corr(results['Infant_Enrolments'])
+    correlation = np.corrcoef(results['Adult_Demo_Updates'].to_numpy(), results['Infant_Enrolments'].to_numpy())[0, 1]
     print(f"Calculated Correlation Coefficient: {correlation:.2f}")
@@ -4,6 +4,11 @@ import plotly.express as px
 import plotly.graph_objects as go
 import os
 import numpy as np
+from uidai_common import load_data_recursive, render_load_failures
+
+# Sensitive border zones highlighted on the Border Security page
+BORDER_DISTRICTS = frozenset({'Sitamarhi', 'Bahraich', 'Murshidabad', 'South 24 Parganas', 'West Champaran',
+                              'Purbi Champaran', 'North 24 Parganas'})
 
 # ==========================================
 # 1. PAGE CONFIGURATION
@@ -36,91 +41,151 @@ st.markdown("""
 # ==========================================
 # 2. DATA LOADING ENGINE (SMART SEARCH)
 # ==========================================
-@st.cache_data
-def load_data_recursive():
+
+
+# Page aggregations are cached so widget reruns skip the groupby work
+@st.cache_data(show_spinner=False)
+def numeric_total(df):
     """
-    Scans the ENTIRE current directory and all subfolders to find
-    CSV files matching the UIDAI keywords.
+    Sum of every numeric cell, as a single NumPy reduction.
     """
-    data_store = {
-        "enrol": [],
-        "bio": [],
-        "demo": []
-    }
+    if df.empty:
+        return 0
+    return int(df.select_dtypes(include='number').to_numpy().sum())
 
-    # 1. SCANNING FILES
-    current_dir = os.getcwd()
-    file_log = {"enrol": 0, "bio": 0, "demo": 0}
-
-    # Walk through all folders
-    for root, dirs, files in os.walk(current_dir):
-        for file in files:
-            if not file.endswith(".csv"):
-                continue
-
-            file_path = os.path.join(root, file)
-
-            # Match keywords
-            if "api_data_aadhar_enrolment" in file:
-                data_store["enrol"].append(file_path)
-            elif "api_data_aadhar_biometric" in file:
-                data_store["bio"].append(file_path)
-            elif "api_data_aadhar_demographic" in file:
-                data_store["demo"].append(file_path)
-
-    # 2. LOADING DATA
-    final_dfs = {}
-
-    for key, paths in data_store.items():
-        if not paths:
-            final_dfs[key] = pd.DataFrame()
-            continue
-
-        dfs = []
-        for p in paths:
-            try:
-                df = pd.read_csv(p)
-                # Quick Date Standardization
-                df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-                dfs.append(df)
-            except Exception as e:
-                continue
-
-        if dfs:
-            final_dfs[key] = pd.concat(dfs, ignore_index=True)
-            file_log[key] = len(dfs)
-        else:
-            final_dfs[key] = pd.DataFrame()
 
-    # 3. CLEANING DATA (State Names & Nulls)
-    state_map = {
-        'Westbengal': 'West Bengal', 'West  Bengal': 'West Bengal',
-        'Uttaranchal': 'Uttarakhand', 'Orissa': 'Odisha',
-        'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra and Nagar Haveli'
-    }
+@st.cache_data(show_spinner=False)
+def top_districts_by_enrolments(df_enrol, n=15):
+    """
+    Top enrolment districts, colour-coded by border status.
+    """
+    # Row totals first, then a single-column groupby
+    num_cols = df_enrol.select_dtypes(include='number').columns
+    totals = df_enrol[num_cols].sum(axis=1)
+    dist_agg = totals.groupby([df_enrol['state'], df_enrol['district']], observed=True).sum().reset_index(
+        name='New_Enrolments')
+    top_districts = dist_agg.sort_values('New_Enrolments', ascending=False).head(n)
+    top_districts['color'] = np.where(top_districts['district'].isin(BORDER_DISTRICTS), 'red', 'grey')
+    return top_districts
+
+
+@st.cache_data(show_spinner=False)
+def ops_load_weekly(df_demo):
+    """
+    Total demographic load per weekday, Monday first.
+    """
+    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    weekly_load = df_demo.groupby(df_demo['date'].dt.day_name()).sum(numeric_only=True).sum(axis=1)
+    return weekly_load.reindex(days)
+
+
+@st.cache_data(show_spinner=False)
+def ops_load_monthly(df_demo):
+    """
+    Total demographic load per calendar month.
+    """
+    return df_demo.set_index('date').resample('M').sum(numeric_only=True).sum(axis=1)
 
-    for key in final_dfs:
-        df = final_dfs[key]
-        if not df.empty and 'state' in df.columns:
-            df['state'] = df['state'].replace(state_map)
-            df['state'] = df['state'].str.strip().str.title()
 
-            # Fill numeric nulls with 0
-            num_cols = df.select_dtypes(include=['number']).columns
-            df[num_cols] = df[num_cols].fillna(0)
-            final_dfs[key] = df
+@st.cache_data(show_spinner=False)
+def adult_share_by_state(df_enrol, n=10):
+    """
+    States with the highest share of adult (18+) enrolments.
+    """
+    state_stats = df_enrol.groupby('state', observed=True)[['age_0_5', 'age_18_greater']].sum()
+    state_stats['Adult_Share'] = (state_stats['age_18_greater'] / state_stats.sum(axis=1)) * 100
+    return state_stats.sort_values('Adult_Share', ascending=False).head(n)
 
-    return final_dfs, file_log
 
+@st.cache_data(show_spinner=False)
+def digital_divide_ratio(df_demo, df_bio, n=10):
+    """
+    Districts with the highest demographic-to-biometric update ratio.
+    """
+    demo_count = df_demo.groupby('district', observed=True).sum(numeric_only=True).sum(axis=1)
+    bio_count = df_bio.groupby('district', observed=True).sum(numeric_only=True).sum(axis=1)
+
+    ratio_df = pd.DataFrame({'Demo': demo_count, 'Bio': bio_count}).fillna(0)
+    ratio_df['Ratio'] = ratio_df['Demo'] / (ratio_df['Bio'] + 1)
+    ratio_df = ratio_df[ratio_df['Bio'] > 100]  # Filter small noise
+    return ratio_df.sort_values('Ratio', ascending=False).head(n)
+
+
+
+# Figures are cached as shared resources so a rerun re-sends them without rebuilding
+@st.cache_resource(show_spinner=False)
+def make_border_fig(top_districts):
+    return px.bar(
+        top_districts,
+        x='district',
+        y='New_Enrolments',
+        color='color',
+        color_discrete_map={'red': '#ff4b4b', 'grey': '#bdc3c7'},
+        title="Top 15 Districts by Enrolment Volume (Red = Sensitive Border Zone)",
+        text_auto='.2s'
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def make_weekly_fig(weekly_load):
+    fig_week = px.line(
+        x=weekly_load.index,
+        y=weekly_load.values,
+        markers=True,
+        title='Weekly Load Distribution: The "Double Spike" Pattern'
+    )
+    fig_week.update_traces(line_color='#1f77b4', line_width=4)
+    fig_week.add_annotation(x='Tuesday', y=weekly_load.get('Tuesday', 0), text="Tuesday Surge", showarrow=True)
+    fig_week.add_annotation(x='Saturday', y=weekly_load.get('Saturday', 0), text="Weekend Crush", showarrow=True)
+    return fig_week
+
+
+@st.cache_resource(show_spinner=False)
+def make_monthly_fig(monthly_load):
+    fig_month = px.area(
+        x=monthly_load.index,
+        y=monthly_load.values,
+        title='Yearly Timeline: The "August Blackout" & "September Surge"'
+    )
+    fig_month.update_traces(line_color='#ff4b4b')
+    return fig_month
+
+
+@st.cache_resource(show_spinner=False)
+def make_adult_share_fig(top_states):
+    return px.bar(
+        top_states,
+        x='Adult_Share',
+        y=top_states.index,
+        orientation='h',
+        title="Percentage of Enrolments that are Adults (18+)",
+        color='Adult_Share',
+        color_continuous_scale='Reds'
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def make_digital_divide_fig(top_ratio):
+    return px.bar(
+        top_ratio,
+        y=top_ratio.index,
+        x='Ratio',
+        orientation='h',
+        title="Top Districts Ignoring Biometric Updates (High Demo:Bio Ratio)",
+        color_discrete_sequence=['orange']
+    )
 
 # Execute Load
 with st.spinner('Scanning folders for UIDAI datasets...'):
-    data_dict, log_counts = load_data_recursive()
+    data_dict, log_counts, failed_files = load_data_recursive()
 
 df_enrol = data_dict['enrol']
 df_bio = data_dict['bio']
 df_demo = data_dict['demo']
 
+# Files that could not be parsed are skipped, but listed
+render_load_failures(failed_files)
+
 # Check if data loaded
 total_files = sum(log_counts.values())
 if total_files == 0:
@@ -166,9 +231,8 @@ if page == "Executive Summary":
     # KPI Row
     c1, c2, c3, c4 = st.columns(4)
 
-    total_enrol = df_enrol.select_dtypes(include='number').sum().sum() if not df_enrol.empty else 0
-    total_updates = (df_bio.select_dtypes(include='number').sum().sum() +
-                     df_demo.select_dtypes(include='number').sum().sum()) if not df_bio.empty else 0
+    total_enrol = numeric_total(df_enrol)
+    total_updates = (numeric_total(df_bio) + numeric_total(df_demo)) if not df_bio.empty else 0
 
     with c1:
         st.metric("Total Transactions", f"{(total_enrol + total_updates) / 1000000:.1f}M", "2025 Data")
@@ -225,31 +289,10 @@ elif page == "Border Security":
     st.markdown("Comparing **New Enrolment Velocity** between Border Districts and Metro Hubs.")
 
     if not df_enrol.empty:
-        # Aggregating Data
-        dist_agg = df_enrol.groupby(['state', 'district']).sum(numeric_only=True).sum(axis=1).reset_index(
-            name='New_Enrolments')
-        top_districts = dist_agg.sort_values('New_Enrolments', ascending=False).head(15)
-
-
-        # Color coding for plot
-        def get_color(row):
-            border_districts = ['Sitamarhi', 'Bahraich', 'Murshidabad', 'South 24 Parganas', 'West Champaran',
-                                'Purbi Champaran', 'North 24 Parganas']
-            return 'red' if row['district'] in border_districts else 'grey'
+        # Aggregating Data (color coded by border status)
+        top_districts = top_districts_by_enrolments(df_enrol)
 
-
-        top_districts['color'] = top_districts.apply(get_color, axis=1)
-
-        fig = px.bar(
-            top_districts,
-            x='district',
-            y='New_Enrolments',
-            color='color',
-            color_discrete_map={'red': '#ff4b4b', 'grey': '#bdc3c7'},
-            title="Top 15 Districts by Enrolment Volume (Red = Sensitive Border Zone)",
-            text_auto='.2s'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(make_border_fig(top_districts), use_container_width=True)
 
         st.warning(
             "**Observation:** Border districts like **Sitamarhi** and **Bahraich** are enrolling people at the same rate as massive metro hubs like **Thane** or **Pune**, despite having a fraction of the population density. This suggests unnatural growth.")
@@ -265,35 +308,14 @@ elif page == "Operational Efficiency":
 
     if not df_demo.empty:
         # 1. Weekly Trend
-        df_demo['weekday'] = df_demo['date'].dt.day_name()
-        weekly_load = df_demo.groupby('weekday').sum(numeric_only=True).sum(axis=1)
-
-        # Sort days
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekly_load = weekly_load.reindex(days)
-
-        fig_week = px.line(
-            x=weekly_load.index,
-            y=weekly_load.values,
-            markers=True,
-            title='Weekly Load Distribution: The "Double Spike" Pattern'
-        )
-        fig_week.update_traces(line_color='#1f77b4', line_width=4)
-        fig_week.add_annotation(x='Tuesday', y=weekly_load.get('Tuesday', 0), text="Tuesday Surge", showarrow=True)
-        fig_week.add_annotation(x='Saturday', y=weekly_load.get('Saturday', 0), text="Weekend Crush", showarrow=True)
+        weekly_load = ops_load_weekly(df_demo)
 
-        st.plotly_chart(fig_week, use_container_width=True)
+        st.plotly_chart(make_weekly_fig(weekly_load), use_container_width=True)
 
         # 2. Monthly Trend (The August Gap)
-        monthly_load = df_demo.set_index('date').resample('M').sum(numeric_only=True).sum(axis=1)
+        monthly_load = ops_load_monthly(df_demo)
 
-        fig_month = px.area(
-            x=monthly_load.index,
-            y=monthly_load.values,
-            title='Yearly Timeline: The "August Blackout" & "September Surge"'
-        )
-        fig_month.update_traces(line_color='#ff4b4b')
-        st.plotly_chart(fig_month, use_container_width=True)
+        st.plotly_chart(make_monthly_fig(monthly_load), use_container_width=True)
 
         st.success(
             "**Recommendation:** Implement automated server auto-scaling on **Tuesday (10 AM)** and **Saturday (9 AM)**. Investigate the August data loss event.")
@@ -311,20 +333,9 @@ elif page == "Societal Trends":
     with tab1:
         st.markdown("### The 'Hidden Adult' Cohort")
         if not df_enrol.empty:
-            state_stats = df_enrol.groupby('state')[['age_0_5', 'age_18_greater']].sum()
-            state_stats['Adult_Share'] = (state_stats['age_18_greater'] / state_stats.sum(axis=1)) * 100
-            top_states = state_stats.sort_values('Adult_Share', ascending=False).head(10)
-
-            fig_ne = px.bar(
-                top_states,
-                x='Adult_Share',
-                y=top_states.index,
-                orientation='h',
-                title="Percentage of Enrolments that are Adults (18+)",
-                color='Adult_Share',
-                color_continuous_scale='Reds'
-            )
-            st.plotly_chart(fig_ne, use_container_width=True)
+            top_states = adult_share_by_state(df_enrol)
+
+            st.plotly_chart(make_adult_share_fig(top_states), use_container_width=True)
             st.info(
                 "While the national average is <1%, **Meghalaya** is at **32%**. The system needs 'Adult-Centric' centers here.")
 
@@ -333,25 +344,10 @@ elif page == "Societal Trends":
         st.markdown("Ratio of **Demographic Updates** (Phone/Address) to **Biometric Updates**.")
 
         if not df_bio.empty and not df_demo.empty:
-            # Calculate simple ratio per state/district for Top 10
-            demo_count = df_demo.groupby('district').sum(numeric_only=True).sum(axis=1)
-            bio_count = df_bio.groupby('district').sum(numeric_only=True).sum(axis=1)
-
-            ratio_df = pd.DataFrame({'Demo': demo_count, 'Bio': bio_count}).fillna(0)
-            ratio_df['Ratio'] = ratio_df['Demo'] / (ratio_df['Bio'] + 1)
-            ratio_df = ratio_df[ratio_df['Bio'] > 100]  # Filter small noise
-
-            top_ratio = ratio_df.sort_values('Ratio', ascending=False).head(10)
-
-            fig_div = px.bar(
-                top_ratio,
-                y=top_ratio.index,
-                x='Ratio',
-                orientation='h',
-                title="Top Districts Ignoring Biometric Updates (High Demo:Bio Ratio)",
-                color_discrete_sequence=['orange']
-            )
-            st.plotly_chart(fig_div, use_container_width=True)
+            # Calculate simple ratio per district for Top 10
+            top_ratio = digital_divide_ratio(df_demo, df_bio)
+
+            st.plotly_chart(make_digital_divide_fig(top_ratio), use_container_width=True)
             st.warning(
                 "Districts like **Manendragarh** have a 20:1 ratio. People update phones for benefits but ignore biometrics.")
         else:
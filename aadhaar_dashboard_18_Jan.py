@@ -2,10 +2,21 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import os
-import glob
 import numpy as np
-from datetime import timedelta
+from uidai_common import (CUSTOM_CSS, load_data_recursive, lttb_indices,
+                          render_explainer, render_load_failures)
+
+# Polars is optional: its multi-threaded group_by backs the heavy Q1/Q3/Q4 aggregations
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# numba is optional as well: without Polars, a compiled code-indexed sum replaces the pandas groupby
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # ==========================================
 # 1. PAGE CONFIGURATION
@@ -18,134 +29,193 @@ st.set_page_config(
 )
 
 # Custom CSS for "Card-like" feel & Typography
-st.markdown("""
-<style>
-    /* Main Background */
-    .stApp {
-        background-color: #ffffff;
-    }
-
-    /* Metric Cards */
-    .metric-card {
-        background-color: #f8f9fa;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        border-top: 4px solid #ff4b4b;
-        margin-bottom: 20px;
-        color: #31333F;
-    }
-    .metric-card h4 {
-        margin-top: 0;
-        color: #ff4b4b;
-        font-size: 1.1rem;
-    }
-    .metric-card p {
-        font-size: 0.95rem;
-        margin-bottom: 0;
-        color: #555;
-    }
-
-    /* Concept & Statement Boxes */
-    .concept-box {
-        background-color: #e3f2fd;
-        padding: 15px;
-        border-radius: 8px;
-        border-left: 5px solid #2196f3;
-        margin-bottom: 15px;
-        color: #0d47a1;
-    }
-    .insight-box {
-        background-color: #ffebee;
-        padding: 15px;
-        border-radius: 8px;
-        border-left: 5px solid #f44336;
-        margin-bottom: 15px;
-        color: #b71c1c;
-    }
-
-    /* Headers */
-    h1, h2, h3 {
-        color: #2c3e50;
-        font-family: 'Sans-Serif';
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
 # ==========================================
-# 2. DATA LOADING ENGINE (Recursive & Robust)
+# 2. AGGREGATION ENGINE (frames come from uidai_common.load_data_recursive)
 # ==========================================
-@st.cache_data
-def load_data_recursive():
+def _row_sum(df, cols):
     """
-    Robust recursive loader to find UIDAI datasets in any subfolder.
+    Per-row sum of the given columns, reduced in NumPy over a single 2-D array.
     """
-    data_store = {"enrol": [], "bio": [], "demo": []}
-    current_dir = os.getcwd()
-
-    # 1. SCAN
-    for root, dirs, files in os.walk(current_dir):
-        for file in files:
-            if not file.endswith(".csv"): continue
-            path = os.path.join(root, file)
-            if "api_data_aadhar_enrolment" in file:
-                data_store["enrol"].append(path)
-            elif "api_data_aadhar_biometric" in file:
-                data_store["bio"].append(path)
-            elif "api_data_aadhar_demographic" in file:
-                data_store["demo"].append(path)
-
-    # 2. LOAD & CONCAT
-    final_dfs = {}
-    for key, paths in data_store.items():
-        dfs = []
-        for p in paths:
-            try:
-                df = pd.read_csv(p)
-                # Parse Dates carefully
-                df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-                dfs.append(df)
-            except:
+    values = df[list(cols)].to_numpy()
+    # Integer counts accumulate in int64, matching pandas' sum(axis=1)
+    return pd.Series(values.sum(axis=1, dtype=np.int64 if values.dtype.kind in 'iu' else None), index=df.index)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _sum_by_code(codes, values, n_groups):
+        """
+        Single pass over the rows: adds every value of row i to the slot of its category code.
+        """
+        totals = np.zeros(n_groups, dtype=np.int64)
+        counts = np.zeros(n_groups, dtype=np.int64)
+        for i in range(codes.shape[0]):
+            c = codes[i]
+            if c < 0:
                 continue
-        final_dfs[key] = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+            counts[c] += 1
+            for j in range(values.shape[1]):
+                totals[c] += values[i, j]
+        return totals, counts
+
+
+def _group_total(df, key, cols):
+    """
+    Per-key total of the given columns, summed across columns.
+    Runs as a lazy Polars query when Polars is installed, then as a numba kernel
+    over categorical codes when numba is, otherwise in pandas.
+    """
+    cols = list(cols)
+    labels = df[key]
+    is_cat = isinstance(labels.dtype, pd.CategoricalDtype)
+    if pl is None:
+        if njit is not None and is_cat and all(pd.api.types.is_integer_dtype(df[c]) for c in cols):
+            totals, counts = _sum_by_code(labels.cat.codes.to_numpy(), df[cols].to_numpy(),
+                                          len(labels.cat.categories))
+            seen = np.flatnonzero(counts)  # observed=True: drop categories without rows
+            index = pd.CategoricalIndex(pd.Categorical.from_codes(seen, dtype=labels.dtype), name=key)
+            return pd.Series(totals[seen], index=index)
+
+        # Row totals first, so the groupby aggregates a single column
+        return _row_sum(df, cols).groupby(labels, observed=True).sum()
+
+    # Categorical keys are grouped on their integer codes and decoded afterwards
+    frame = df[cols].assign(**{key: labels.cat.codes}) if is_cat else df[[key] + cols]
+    valid = (pl.col(key) >= 0) if is_cat else pl.col(key).is_not_null()
+
+    out = (pl.from_pandas(frame).lazy()
+           .filter(valid)
+           .group_by(key)
+           .agg(pl.sum_horizontal(pl.col(cols).cast(pl.Int64)).sum().alias('total'))  # int32 sums would overflow
+           .sort(key)
+           .collect()
+           .to_pandas())
+    if is_cat:
+        index = pd.CategoricalIndex(pd.Categorical.from_codes(out[key], dtype=labels.dtype), name=key)
+    else:
+        index = pd.Index(out[key], name=key)
+    return pd.Series(out['total'].to_numpy(), index=index)
+
+
+def pincode_digital_ratio(d_pin, b_pin):
+    """
+    Per-pincode Digital Ratio with an Urban/Rural volume class (Q3).
+    Built once on NumPy arrays; only the two plotted columns are kept.
+    """
+    demo = d_pin.to_numpy(dtype=np.float64)
+    bio = b_pin.reindex(d_pin.index, fill_value=0).to_numpy(dtype=np.float64)
+    total = demo + bio
+
+    # Filter for statistical significance (>50 transactions)
+    keep = total > 50
+    demo, bio, total = demo[keep], bio[keep], total[keep]
+
+    # Classify Urban/Rural by Volume Percentile
+    limit = np.quantile(total, 0.90) if total.size else np.nan
+    return pd.DataFrame({
+        'Digital_Ratio': demo / (bio + 1),
+        'Category': np.where(total > limit, 'Urban (High Volume)', 'Rural (Low Volume)'),
+    }, index=d_pin.index[keep])
+
+
+# Grouped totals reused across modules; every entry is a small Series/frame (None if its dataset is empty)
+@st.cache_resource(show_spinner=False)
+def build_summaries(df_e, df_b, df_d):
+    """
+    Computes every per-state, per-pincode and per-date total once per dataset.
+    """
+    summaries = dict.fromkeys([
+        'state_enrol', 'state_enrol_5_17', 'state_bio', 'state_bio_5_17', 'state_demo',
+        'pincode_ratio', 'daily_demo', 'weekly_demo'
+    ])
+
+    if not df_e.empty:
+        summaries['state_enrol'] = _group_total(df_e, 'state', ['age_0_5', 'age_5_17', 'age_18_greater'])
+        summaries['state_enrol_5_17'] = df_e.groupby('state', observed=True)['age_5_17'].sum()
+
+    if not df_b.empty:
+        summaries['state_bio'] = _group_total(df_b, 'state', ['bio_age_5_17', 'bio_age_17_'])
+        summaries['state_bio_5_17'] = df_b.groupby('state', observed=True)['bio_age_5_17'].sum()
+
+    if not df_d.empty:
+        num_cols = df_d.select_dtypes(include=np.number).columns
+        summaries['state_demo'] = _group_total(df_d, 'state', ['demo_age_5_17', 'demo_age_17_'])
+        summaries['daily_demo'] = _group_total(df_d, 'date', num_cols)
+        summaries['weekly_demo'] = _row_sum(df_d, num_cols).set_axis(df_d['date']).resample('W').sum()
+
+    if not df_d.empty and not df_b.empty:
+        summaries['pincode_ratio'] = pincode_digital_ratio(
+            _group_total(df_d, 'pincode', ['demo_age_17_']), _group_total(df_b, 'pincode', ['bio_age_17_']))
+
+    return summaries
+
+
+# Module views are cached so widget reruns only do a dictionary lookup
+@st.cache_data(show_spinner=False)
+def maintenance_matrix(enrol_agg, bio_agg, demo_agg):
+    """
+    Per-state new enrolments vs total updates (Bio + Demo) for Q1.
+    """
+    update_agg = pd.Series(0, index=enrol_agg.index)
 
-    # 3. CLEAN & STANDARDIZE
-    state_map = {
-        'Westbengal': 'West Bengal', 'West  Bengal': 'West Bengal',
-        'Uttaranchal': 'Uttarakhand', 'Orissa': 'Odisha',
-        'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra and Nagar Haveli'
-    }
+    if bio_agg is not None:
+        update_agg = update_agg.add(bio_agg, fill_value=0)
+    if demo_agg is not None:
+        update_agg = update_agg.add(demo_agg, fill_value=0)
 
-    for key in final_dfs:
-        df = final_dfs[key]
-        if not df.empty:
-            # Normalize State Names
-            if 'state' in df.columns:
-                df['state'] = df['state'].replace(state_map).str.strip().str.title()
+    df_q1 = pd.DataFrame({'Enrolment': enrol_agg, 'Updates': update_agg}).dropna()
+    return df_q1[df_q1['Enrolment'] > 1000]  # Filter small noise
 
-            # Fill Numeric Nulls
-            num_cols = df.select_dtypes(include=np.number).columns
-            df[num_cols] = df[num_cols].fillna(0)
 
-            final_dfs[key] = df
+@st.cache_data(show_spinner=False)
+def compliance_gap(e_5_17, b_5_17, n=10):
+    """
+    School-age enrolments vs mandatory biometric updates for the top states (Q2).
+    """
+    df_q2 = pd.DataFrame({'New Enrolments (5-17)': e_5_17, 'Mandatory Updates (5-17)': b_5_17})
+    df_q2 = df_q2.fillna(0)
+
+    # Sort by volume and take top n
+    df_q2['Total_Vol'] = df_q2.sum(axis=1)
+    return df_q2.sort_values('Total_Vol', ascending=False).head(n).drop(columns=['Total_Vol'])
+
 
-    return final_dfs
+@st.cache_data(show_spinner=False)
+def daily_anomalies(daily, window='28D'):
+    """
+    Daily volume flagged against a local Mean + 2σ threshold (Q4).
+    """
+    # Anomaly Logic: centred 28-day statistics, so weekly peaks and the August outage
+    # only shape the threshold of their own neighbourhood, not the whole year
+    rolling = daily.rolling(window, center=True, min_periods=7)
+    limit = rolling.mean() + (2 * rolling.std())
+
+    df_daily = daily.to_frame(name='Volume')
+    df_daily['Status'] = np.where(df_daily['Volume'] > limit, 'Anomaly (>2σ)', 'Normal')
+    return df_daily
 
 
 # Load Data with Spinner
 with st.spinner('🚀 Initializing Analytics Engine... Scanning for Datasets...'):
-    data_dict = load_data_recursive()
+    data_dict, _, failed_files = load_data_recursive()
     df_e = data_dict['enrol']
     df_b = data_dict['bio']
     df_d = data_dict['demo']
 
+# Files that could not be parsed are skipped, but listed
+render_load_failures(failed_files)
+
 # Validation Check
 if df_e.empty and df_b.empty and df_d.empty:
     st.error("❌ Critical Error: No Data Found!")
     st.info("Please ensure the CSV files (api_data_aadhar_*.csv) are present in this folder or subfolders.")
     st.stop()
 
+summaries = build_summaries(df_e, df_b, df_d)
+
 # ==========================================
 # 3. SIDEBAR NAVIGATION
 # ==========================================
@@ -172,30 +242,6 @@ with st.sidebar:
     st.info(f"Demographic: {len(df_d):,} rows")
 
 
-# ==========================================
-# 4. HELPER: CONCEPT & STATEMENT RENDERER
-# ==========================================
-def render_explainer(concept_text, insight_text):
-    """
-    Renders the Concept (Math) and Statement (Insight) boxes side-by-side.
-    """
-    c1, c2 = st.columns(2)
-    with c1:
-        st.markdown(f"""
-        <div class='concept-box'>
-            <b>📐 Concept (The Methodology)</b><br>
-            {concept_text}
-        </div>
-        """, unsafe_allow_html=True)
-    with c2:
-        st.markdown(f"""
-        <div class='insight-box'>
-            <b>💡 Statement (The Insight)</b><br>
-            {insight_text}
-        </div>
-        """, unsafe_allow_html=True)
-
-
 # ==========================================
 # 5. PAGE LOGIC: EXECUTIVE SUMMARY
 # ==========================================
@@ -270,18 +316,7 @@ elif menu == "Q1: Maintenance Gap":
 
     if not df_e.empty and (not df_b.empty or not df_d.empty):
         # Data Preparation
-        enrol_agg = df_e.groupby('state')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1)
-        update_agg = pd.Series(0, index=enrol_agg.index)
-
-        if not df_b.empty:
-            update_agg = update_agg.add(df_b.groupby('state')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1),
-                                        fill_value=0)
-        if not df_d.empty:
-            update_agg = update_agg.add(df_d.groupby('state')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1),
-                                        fill_value=0)
-
-        df_q1 = pd.DataFrame({'Enrolment': enrol_agg, 'Updates': update_agg}).dropna()
-        df_q1 = df_q1[df_q1['Enrolment'] > 1000]  # Filter small noise
+        df_q1 = maintenance_matrix(summaries['state_enrol'], summaries['state_bio'], summaries['state_demo'])
 
         # Quadrant Plot
         fig = px.scatter(
@@ -314,16 +349,8 @@ elif menu == "Q2: Compliance Check":
     )
 
     if not df_e.empty and not df_b.empty:
-        # Data Prep
-        e_5_17 = df_e.groupby('state')['age_5_17'].sum()
-        b_5_17 = df_b.groupby('state')['bio_age_5_17'].sum()
-
-        df_q2 = pd.DataFrame({'New Enrolments (5-17)': e_5_17, 'Mandatory Updates (5-17)': b_5_17})
-        df_q2 = df_q2.fillna(0)
-
-        # Sort by volume and take top 10
-        df_q2['Total_Vol'] = df_q2.sum(axis=1)
-        df_q2 = df_q2.sort_values('Total_Vol', ascending=False).head(10).drop(columns=['Total_Vol'])
+        # Data Prep (top 10 states by volume)
+        df_q2 = compliance_gap(summaries['state_enrol_5_17'], summaries['state_bio_5_17'])
 
         # Bar Chart
         fig = px.bar(
@@ -350,21 +377,7 @@ elif menu == "Q3: Urban vs Rural":
 
     if not df_d.empty and not df_b.empty:
         # Pincode Level Aggregation
-        d_pin = df_d.groupby('pincode')[['demo_age_17_']].sum()
-        b_pin = df_b.groupby('pincode')[['bio_age_17_']].sum()
-
-        df_q3 = d_pin.join(b_pin, lsuffix='_d', rsuffix='_b').fillna(0)
-        df_q3['Total'] = df_q3['demo_age_17_'] + df_q3['bio_age_17_']
-
-        # Filter for statistical significance (>50 transactions)
-        df_q3 = df_q3[df_q3['Total'] > 50]
-
-        # Calculate Metric
-        df_q3['Digital_Ratio'] = df_q3['demo_age_17_'] / (df_q3['bio_age_17_'] + 1)
-
-        # Classify Urban/Rural by Volume Percentile
-        limit = df_q3['Total'].quantile(0.90)
-        df_q3['Category'] = np.where(df_q3['Total'] > limit, 'Urban (High Volume)', 'Rural (Low Volume)')
+        df_q3 = summaries['pincode_ratio']
 
         # Box Plot
         fig = px.box(
@@ -388,29 +401,24 @@ elif menu == "Q4: Anomaly Detection":
     st.title("Q4: Detect Anomalies where Updates Spike Unusually")
 
     render_explainer(
-        concept_text="We analyze daily transaction volumes using a <b>Z-Score Approach</b>. <br>Any day where volume exceeds <b>Mean + 2 Standard Deviations (2σ)</b> is flagged as an 'Operational Anomaly'.",
+        concept_text="We analyze daily transaction volumes using a <b>Z-Score Approach</b>. <br>Any day where volume exceeds the <b>28-day rolling Mean + 2 Standard Deviations (2σ)</b> is flagged as an 'Operational Anomaly'.",
         insight_text="The system shows a recurring <b>'Double Spike'</b> pattern on Saturdays and Tuesdays, consistently breaching the 2σ threshold. Additionally, a massive <b>System Outage in August</b> was followed by a 'Recovery Surge' in September."
     )
 
     if not df_d.empty:
         # Time Series Aggregation
-        daily = df_d.groupby('date').sum(numeric_only=True).sum(axis=1)
-
-        # Anomaly Logic
-        mean = daily.mean()
-        std = daily.std()
-        limit = mean + (2 * std)
-
-        df_daily = daily.to_frame(name='Volume')
-        df_daily['Status'] = np.where(df_daily['Volume'] > limit, 'Anomaly (>2σ)', 'Normal')
+        df_daily = daily_anomalies(summaries['daily_demo'])
 
         # Line Chart with Anomaly Scatter
-        fig = px.line(df_daily, y='Volume', title="Daily Server Load & Anomaly Detection (2025)")
+        # WebGL traces keep the daily series responsive as the date range grows;
+        # the line is capped at display resolution, anomalies are always drawn in full
+        df_line = df_daily.iloc[lttb_indices(df_daily['Volume'].to_numpy())]
+        fig = px.line(df_line, y='Volume', render_mode='webgl', title="Daily Server Load & Anomaly Detection (2025)")
         fig.update_traces(line_color='#bdc3c7')
 
         # Overlay Anomalies
         anomalies = df_daily[df_daily['Status'] == 'Anomaly (>2σ)']
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=anomalies.index,
             y=anomalies['Volume'],
             mode='markers',
@@ -435,7 +443,7 @@ elif menu == "Q5: Load Forecasting":
 
     if not df_d.empty:
         # Weekly Aggregation
-        weekly = df_d.set_index('date').resample('W').sum(numeric_only=True).sum(axis=1)
+        weekly = summaries['weekly_demo']
 
         # Forecast Logic
         last_4_avg = weekly.tail(4).mean()
@@ -444,22 +452,24 @@ elif menu == "Q5: Load Forecasting":
 
         last_date = weekly.index[-1]
         future_weeks = 12
-        future_dates = [last_date + timedelta(weeks=x) for x in range(1, future_weeks + 1)]
+        future_dates = last_date + pd.to_timedelta(np.arange(1, future_weeks + 1), unit='W')
         # Formula: Last_Avg * (1 + (Growth * Month_Index))
-        future_vals = [last_4_avg * (1 + (growth_factor * i / 4)) for i in range(1, future_weeks + 1)]
+        week_index = np.arange(1, future_weeks + 1)
+        future_vals = last_4_avg * (1 + (growth_factor * week_index / 4))
 
         # Visualization
         fig = go.Figure()
 
-        # Historical Data
-        fig.add_trace(go.Scatter(
-            x=weekly.index, y=weekly.values,
+        # Historical Data (capped at display resolution)
+        weekly_line = weekly.iloc[lttb_indices(weekly.to_numpy())]
+        fig.add_trace(go.Scattergl(
+            x=weekly_line.index, y=weekly_line.values,
             name='Actual Load (2025)',
             line=dict(color='#2980b9', width=3)
         ))
 
         # Forecast Data
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=future_dates, y=future_vals,
             name='Q1 2026 Forecast',
             line=dict(color='#27ae60', width=3, dash='dash')
@@ -488,13 +498,18 @@ elif menu == "Data Inspector":
     target = df_e if choice == "Enrolment" else (df_b if choice == "Biometric Updates" else df_d)
 
     if not target.empty:
-        # State Filter
-        all_states = target['state'].unique().tolist()
+        # State Filter (options come straight from the categorical, no column scan)
+        all_states = target['state'].cat.categories.tolist()
         sel_states = st.multiselect("Filter by State", all_states, default=all_states[:2] if all_states else None)
 
-        view_df = target[target['state'].isin(sel_states)] if sel_states else target
+        if sel_states:
+            # isin on a categorical compares integer codes; only the previewed rows are materialized
+            rows = np.flatnonzero(target['state'].isin(sel_states).to_numpy())
+            n_rows, preview = len(rows), target.iloc[rows[:1000]]
+        else:
+            n_rows, preview = len(target), target.head(1000)
 
-        st.dataframe(view_df.head(1000), use_container_width=True)
-        st.caption(f"Showing {len(view_df)} rows (capped at 1000 for preview)")
+        st.dataframe(preview, use_container_width=True)
+        st.caption(f"Showing {n_rows} rows (capped at 1000 for preview)")
     else:
         st.error("Selected dataset is empty.")
\ No newline at end of file
@@ -2,10 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import os
-import glob
 import numpy as np
-from datetime import timedelta
+from types import SimpleNamespace
+from uidai_common import (CUSTOM_CSS, frame_to_csv_bytes, load_data_recursive, lttb_indices,
+                          render_explainer, render_load_failures)
+
+# Polars is optional: its multi-threaded group_by backs the per-state/district totals in build_facts
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 # ==========================================
 # 1. PAGE CONFIGURATION
@@ -18,135 +24,381 @@ st.set_page_config(
 )
 
 # Custom CSS for "Card-like" feel & Typography (Light Theme)
-st.markdown("""
-<style>
-    /* Main Background */
-    .stApp {
-        background-color: #ffffff;
-    }
-
-    /* Metric Cards */
-    .metric-card {
-        background-color: #f8f9fa;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        border-top: 4px solid #ff4b4b;
-        margin-bottom: 20px;
-        color: #31333F;
-    }
-    .metric-card h4 {
-        margin-top: 0;
-        color: #ff4b4b;
-        font-size: 1.1rem;
-    }
-    .metric-card p {
-        font-size: 0.95rem;
-        margin-bottom: 0;
-        color: #555;
-    }
-
-    /* Concept & Statement Boxes */
-    .concept-box {
-        background-color: #e3f2fd;
-        padding: 15px;
-        border-radius: 8px;
-        border-left: 5px solid #2196f3;
-        margin-bottom: 15px;
-        color: #0d47a1;
-    }
-    .insight-box {
-        background-color: #ffebee;
-        padding: 15px;
-        border-radius: 8px;
-        border-left: 5px solid #f44336;
-        margin-bottom: 15px;
-        color: #b71c1c;
-    }
-
-    /* Headers */
-    h1, h2, h3 {
-        color: #2c3e50;
-        font-family: 'Sans-Serif';
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
 # ==========================================
-# 2. DATA LOADING ENGINE (Recursive & Robust)
+# 2. DATA LOADING (shared with the other dashboards via uidai_common)
 # ==========================================
-@st.cache_data
-def load_data_recursive():
-    """
-    Robust recursive loader to find UIDAI datasets in any subfolder.
-    This logic ensures the dashboard works with the user's file structure.
-    """
-    data_store = {"enrol": [], "bio": [], "demo": []}
-    current_dir = os.getcwd()
-    file_log = {"enrol": 0, "bio": 0, "demo": 0}
-
-    # 1. SCAN
-    for root, dirs, files in os.walk(current_dir):
-        for file in files:
-            if not file.endswith(".csv"): continue
-            path = os.path.join(root, file)
-            if "api_data_aadhar_enrolment" in file:
-                data_store["enrol"].append(path)
-            elif "api_data_aadhar_biometric" in file:
-                data_store["bio"].append(path)
-            elif "api_data_aadhar_demographic" in file:
-                data_store["demo"].append(path)
-
-    # 2. LOAD & CONCAT
-    final_dfs = {}
-    for key, paths in data_store.items():
-        dfs = []
-        for p in paths:
-            try:
-                df = pd.read_csv(p)
-                # Parse Dates carefully
-                df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-                dfs.append(df)
-            except:
-                continue
-        
-        if dfs:
-            final_dfs[key] = pd.concat(dfs, ignore_index=True)
-            file_log[key] = len(dfs)
-        else:
-            final_dfs[key] = pd.DataFrame()
+# Count columns per dataset
+ENROL_COLS = ['age_0_5', 'age_5_17', 'age_18_greater']
+BIO_COLS = ['bio_age_5_17', 'bio_age_17_']
+DEMO_COLS = ['demo_age_5_17', 'demo_age_17_']
+
+# District groups highlighted on the Border Security page (based on the user's previous analysis)
+BORDER_DISTRICTS = frozenset({'Sitamarhi', 'Bahraich', 'Murshidabad', 'West Champaran', 'East Champaran',
+                              'North 24 Parganas'})
+METRO_DISTRICTS = frozenset({'Thane', 'Pune', 'Bengaluru', 'Jaipur', 'Agra'})
+
+
+def _row_total(df, cols):
+    """
+    Per-row sum of the given count columns, so grouped totals need a single-column groupby.
+    """
+    values = df[cols].to_numpy()
+    # Integer counts accumulate in int64, like pandas' own sums
+    return pd.Series(values.sum(axis=1, dtype=np.int64 if values.dtype.kind in 'iu' else None), index=df.index)
+
+
+def _numeric_total(df, count_total, count_cols):
+    """
+    Row total over every numeric column, matching the numeric_only sums the timelines were built from.
+    Reuses the dataset's combined count column, so only the remaining numeric columns are added.
+    """
+    rest = df.select_dtypes('number').columns.difference(count_cols, sort=False)
+    return count_total + _row_total(df, rest) if len(rest) else count_total
+
+
+def _group_sum(values, keys):
+    """
+    Per-key sums of a row-total Series (or a frame of count columns), like groupby(keys, observed=True).sum().
+    With Polars installed, categorical keys are grouped on their integer codes and decoded afterwards.
+    """
+    keys = list(keys)
+    if pl is None or not all(isinstance(k.dtype, pd.CategoricalDtype) for k in keys):
+        return values.groupby(keys if len(keys) > 1 else keys[0], observed=True).sum()
+
+    frame = values.to_frame('_total') if isinstance(values, pd.Series) else values
+    cols = list(frame.columns)
+    names = [f'_key{i}' for i in range(len(keys))]
+    columns = {name: key.cat.codes.to_numpy() for name, key in zip(names, keys)}
+    columns.update((col, frame[col].to_numpy()) for col in cols)
+
+    out = (pl.DataFrame(columns).lazy()
+           .filter(pl.all_horizontal([pl.col(name) >= 0 for name in names]))  # missing labels are dropped
+           .group_by(names)
+           .agg(pl.col(cols).cast(pl.Int64).sum())  # int32 sums would overflow
+           .sort(names)
+           .collect())
+
+    labels = [pd.Categorical.from_codes(out[name].to_numpy(), dtype=key.dtype) for name, key in zip(names, keys)]
+    if len(keys) == 1:
+        index = pd.CategoricalIndex(labels[0], name=keys[0].name)
+    else:
+        index = pd.MultiIndex.from_arrays(labels, names=[key.name for key in keys])
+    result = pd.DataFrame({col: out[col].to_numpy() for col in cols}, index=index)
+    return result['_total'].rename(values.name) if isinstance(values, pd.Series) else result
+
+
+# One pass per raw frame; the loaded frames are shared and never mutated, so they are keyed by identity
+@st.cache_resource(show_spinner=False, hash_funcs={pd.DataFrame: id})
+def build_facts(df_e, df_b, df_d):
+    """
+    Every grouped total the modules need, computed once per dataset.
+    Attributes are None when their dataset is empty.
+    """
+    facts = SimpleNamespace(state_enrol=None, state_bio=None, state_demo=None, state_demo_17=None,
+                            district_enrol=None, district_bio=None, district_demo=None,
+                            monthly_e=None, monthly_d=None, weekday_d=None,
+                            total_enrol=0, total_updates=0)
+
+    if not df_e.empty:
+        enrol_total = _row_total(df_e, ENROL_COLS)
+        facts.total_enrol = enrol_total.sum()
+        facts.state_enrol = _group_sum(df_e[ENROL_COLS], [df_e['state']])
+        facts.district_enrol = _group_sum(enrol_total, [df_e['state'], df_e['district']])
+        # Reduce to one row total before resampling, so resample walks a single column
+        facts.monthly_e = _numeric_total(df_e, enrol_total, ENROL_COLS).set_axis(df_e['date']).resample('ME').sum()
+
+    if not df_b.empty:
+        bio_total = _row_total(df_b, BIO_COLS)
+        facts.total_updates += bio_total.sum()
+        facts.state_bio = _group_sum(bio_total, [df_b['state']])
+        facts.district_bio = _group_sum(bio_total, [df_b['district']])
+
+    if not df_d.empty:
+        demo_total = _row_total(df_d, DEMO_COLS)
+        facts.total_updates += demo_total.sum()
+        # Both per-state demo totals come out of one grouping pass
+        state_demo = _group_sum(pd.DataFrame({'total': demo_total, 'demo_age_17_': df_d['demo_age_17_']}), [df_d['state']])
+        facts.state_demo = state_demo['total'].rename(None)
+        facts.state_demo_17 = state_demo['demo_age_17_']
+        facts.district_demo = _group_sum(demo_total, [df_d['district']])
+        numeric_total = _numeric_total(df_d, demo_total, DEMO_COLS)
+        facts.monthly_d = numeric_total.set_axis(df_d['date']).resample('ME').sum()
+
+        # Weekday profile as one weighted bincount over the 0-6 codes (no day-name strings, no multi-column groupby).
+        # Empty days stay NaN
+        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        dow = df_d['date'].dt.weekday.fillna(-1).astype('int8').to_numpy()
+        valid = dow >= 0
+        weekly = np.bincount(dow[valid], weights=numeric_total.to_numpy()[valid], minlength=7)
+        counts = np.bincount(dow[valid], minlength=7)
+        facts.weekday_d = pd.Series(np.where(counts > 0, weekly, np.nan), index=days)
+
+    return facts
+
+
+# Module views derive from the small fact tables, so reruns only do a cache lookup
+@st.cache_data(show_spinner=False)
+def maintenance_matrix(state_enrol, state_bio, state_demo):
+    """
+    Per-state new enrolments vs. total (bio + demo) updates (Q1).
+    """
+    enrol_agg = state_enrol.sum(axis=1)
+
+    # Bio + demo aligned in one concat, then placed onto the enrolment states (no updates counts as 0);
+    # both columns then share one index, so there is nothing to drop
+    updates = [s for s in (state_bio, state_demo) if s is not None]
+    update_agg = pd.concat(updates, axis=1).sum(axis=1) if updates else pd.Series(0, index=enrol_agg.index)
+    update_agg = update_agg.reindex(enrol_agg.index, fill_value=0)
+
+    df_q1 = pd.DataFrame({'Enrolment': enrol_agg, 'Updates': update_agg})
+    return df_q1[df_q1['Enrolment'] > 1000]  # Filter small noise
+
+
+@st.cache_data(show_spinner=False)
+def adult_share_by_state(state_enrol, n=10):
+    """
+    States with the highest share of adult (18+) enrolments (Q1).
+    """
+    state_stats = state_enrol[['age_0_5', 'age_18_greater']].copy()
+    state_stats['Adult_Share'] = (state_stats['age_18_greater'] / state_stats.sum(axis=1)) * 100
+    return state_stats.sort_values('Adult_Share', ascending=False).head(n)
+
+
+@st.cache_data(show_spinner=False)
+def digital_divide(district_demo, district_bio, n=15):
+    """
+    Districts with the highest demographic-to-biometric update ratio (Q2).
+    """
+    # Filter districts with significant activity first, so only they are aligned, divided and sorted
+    bio = district_bio[district_bio > 1000]
+    ratio_df = pd.DataFrame({'Demo': district_demo.reindex(bio.index, fill_value=0), 'Bio': bio})
+    # Add 1 to denominator to avoid division by zero and smooth ratio
+    ratio_df['Ratio'] = ratio_df['Demo'] / (ratio_df['Bio'] + 1)
+    return ratio_df.sort_values('Ratio', ascending=False).head(n)
+
+
+@st.cache_data(show_spinner=False)
+def top_districts_by_enrolments(district_enrol, n=15):
+    """
+    Districts with the highest total enrolment volume (Q3).
+    """
+    dist_agg = district_enrol.reset_index(name='New_Enrolments')
+    return dist_agg.sort_values('New_Enrolments', ascending=False).head(n)
+
+
+@st.cache_data(show_spinner=False)
+def parent_child_frame(state_enrol, state_demo_17):
+    """
+    Per-state infant enrolments alongside adult demographic updates (Q4).
+    """
+    child_enrol = state_enrol['age_0_5'].rename('Child_Enrolment')
+    adult_demo_update = state_demo_17.rename('Adult_Demo_Update')
+    # Inner join keeps the states present in both, without building the union and dropping it again
+    return child_enrol.to_frame().join(adult_demo_update, how='inner')
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def filtered_csv(_df, dataset_choice, states):
+    """
+    CSV bytes of the inspector view (Arrow's writer when available, see frame_to_csv_bytes).
+    The frame itself is not hashed; the dataset and state selection are the cache key.
+    """
+    if states:
+        _df = _df[_df['state'].isin(states)]
+    return frame_to_csv_bytes(_df)
+
+
+def session_cached(key, fn, *args):
+    """
+    Per-session memo of a page aggregation, so switching modules reuses the frame
+    instead of unpickling a fresh cache_data copy. The entry keeps its (shared, never
+    mutated) inputs and is recomputed once the data is reloaded. Callers must not mutate the result.
+    """
+    entry = st.session_state.get(key)
+    if entry is None or len(entry[0]) != len(args) or any(a is not b for a, b in zip(entry[0], args)):
+        entry = (args, fn(*args))
+        st.session_state[key] = entry
+    return entry[1]
+
+
+# Figures are built once per distinct (small) input frame and shared as resources;
+# st.plotly_chart only serialises them, so they must not be modified after building
+@st.cache_resource(show_spinner=False)
+def maintenance_matrix_figure(df_q1):
+    """
+    Q1 quadrant plot of enrolments vs. updates, with the key states highlighted.
+    """
+    # One Scattergl trace (GPU-drawn markers) whose marker diameters are
+    # scaled here, same area-proportional look as px's size= with size_max=20
+    enrol = df_q1['Enrolment'].to_numpy(dtype=float)
+    sizes = 20 * np.sqrt(enrol / enrol.max()) if len(enrol) else enrol
+    fig = go.Figure(go.Scattergl(
+        x=df_q1['Enrolment'],
+        y=df_q1['Updates'],
+        mode='markers',
+        # One shared template over a plain label array, rather than per-point hover strings
+        text=df_q1.index.to_numpy(),
+        hovertemplate="<b>%{text}</b><br><br>Enrolment=%{x:,}<br>Updates=%{y:,}<extra></extra>",
+        marker=dict(size=sizes, color=df_q1['Updates'], colorscale='RdYlGn',
+                    showscale=True, colorbar=dict(title='Updates'))
+    ))
+    fig.update_layout(
+        title="State-wise Maintenance Matrix: The Danger Zone (Bottom-Right)",
+        xaxis_title='Enrolment',
+        yaxis_title='Updates'
+    )
+    # Add quadrant lines
+    fig.add_hline(y=df_q1['Updates'].mean(), line_dash="dash", line_color="gray", annotation_text="Avg Updates")
+    fig.add_vline(x=df_q1['Enrolment'].mean(), line_dash="dash", line_color="gray", annotation_text="Avg Enrolment")
+
+    # Highlight key states (Meghalaya, Assam), appended to the quadrant-line labels in one layout update
+    highlights = [
+        dict(x=df_q1.loc[state, 'Enrolment'], y=df_q1.loc[state, 'Updates'], text=state,
+             showarrow=True, arrowhead=1, font=dict(color="red", size=12))
+        for state in ('Meghalaya', 'Assam') if state in df_q1.index
+    ]
+    fig.update_layout(annotations=list(fig.layout.annotations) + highlights)
+    return fig
+
+
+@st.cache_resource(show_spinner=False)
+def adult_share_figure(top_states):
+    """
+    Q1 bar chart of the states with the highest adult enrolment share.
+    """
+    return px.bar(
+        top_states,
+        x='Adult_Share',
+        y=top_states.index,
+        orientation='h',
+        title="Percentage of Enrolments that are Adults (18+)",
+        color='Adult_Share',
+        color_continuous_scale='Reds'
+    )
 
-    # 3. CLEAN & STANDARDIZE
-    state_map = {
-        'Westbengal': 'West Bengal', 'West  Bengal': 'West Bengal',
-        'Uttaranchal': 'Uttarakhand', 'Orissa': 'Odisha',
-        'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra and Nagar Haveli'
-    }
 
-    for key in final_dfs:
-        df = final_dfs[key]
-        if not df.empty:
-            # Normalize State Names
-            if 'state' in df.columns:
-                df['state'] = df['state'].replace(state_map).str.strip().str.title()
+@st.cache_resource(show_spinner=False)
+def digital_divide_figure(top_ratio):
+    """
+    Q2 bar chart of the districts with the widest Demo:Bio ratio.
+    """
+    return px.bar(
+        top_ratio,
+        y=top_ratio.index,
+        x='Ratio',
+        orientation='h',
+        title="Top Districts by Digital Divide Ratio (Demo:Bio)",
+        color='Ratio',
+        color_continuous_scale='Oranges'
+    )
+
 
-            # Fill Numeric Nulls
-            num_cols = df.select_dtypes(include=np.number).columns
-            df[num_cols] = df[num_cols].fillna(0)
+@st.cache_resource(show_spinner=False)
+def border_velocity_figure(top_districts):
+    """
+    Q3 bar chart of the top enrolment districts, coloured by zone.
+    """
+    # Color coding for plot (assign returns a new frame; the input stays untouched)
+    district = top_districts['district']
+    top_districts = top_districts.assign(Zone=np.select(
+        [district.isin(BORDER_DISTRICTS), district.isin(METRO_DISTRICTS)],
+        ['Border Zone', 'Metro Hub'],
+        default='Other'
+    ))
+
+    fig = px.bar(
+        top_districts,
+        x='district',
+        y='New_Enrolments',
+        color='Zone',
+        color_discrete_map={'Border Zone': '#ff4b4b', 'Metro Hub': '#2196f3', 'Other': '#bdc3c7'},
+        title="Top 15 Districts by Enrolment Volume (Highlighting Border Zones)",
+        text_auto='.2s'
+    )
+    fig.update_layout(xaxis_title="District", yaxis_title="Total New Enrolments")
+    return fig
 
-            final_dfs[key] = df
 
-    return final_dfs, file_log
+@st.cache_resource(show_spinner=False)
+def enrolment_timeline_figure(monthly_load):
+    """
+    Q4 monthly enrolment timeline (the August gap).
+    """
+    # Capped at display resolution (LTTB keeps the outage/surge shape); a no-op for a year of months
+    monthly_load = monthly_load.iloc[lttb_indices(monthly_load.to_numpy())]
+    return px.area(
+        x=monthly_load.index,
+        y=monthly_load.values,
+        title='Yearly Timeline: The "August Blackout" & "September Surge" (Enrolment Data)',
+        color_discrete_sequence=['#ff4b4b']
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def parent_child_figure(corr_df):
+    """
+    Q4 scatter of adult demographic updates vs. infant enrolments.
+    """
+    return px.scatter(
+        corr_df,
+        x='Adult_Demo_Update',
+        y='Child_Enrolment',
+        hover_name=corr_df.index,
+        title="Correlation: Adult Demographic Updates vs. Infant Enrolments (0-5)",
+        color_discrete_sequence=['#55a868'],
+        render_mode='webgl'
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def weekly_load_figure(weekly_load):
+    """
+    Q5 weekday load line with the two spikes labelled.
+    """
+    fig_week = px.line(
+        x=weekly_load.index,
+        y=weekly_load.values,
+        markers=True,
+        render_mode='webgl',
+        title='Weekly Load Distribution: The "Double Spike" Pattern (Demographic Data)',
+        color_discrete_sequence=['#1f77b4']
+    )
+    fig_week.update_traces(line_width=4)
+    fig_week.update_layout(annotations=[
+        dict(x='Tuesday', y=weekly_load.get('Tuesday', 0), text="Tuesday Surge", showarrow=True),
+        dict(x='Saturday', y=weekly_load.get('Saturday', 0), text="Weekend Crush", showarrow=True),
+    ])
+    return fig_week
+
+
+@st.cache_resource(show_spinner=False)
+def demographic_timeline_figure(monthly_load_d):
+    """
+    Q5 monthly demographic timeline (the March peak).
+    """
+    monthly_load_d = monthly_load_d.iloc[lttb_indices(monthly_load_d.to_numpy())]
+    return px.bar(
+        x=monthly_load_d.index,
+        y=monthly_load_d.values,
+        title='Yearly Timeline: March Madness (Demographic Data)',
+        color=monthly_load_d.values,
+        color_continuous_scale='Viridis'
+    )
 
 
 # Load Data with Spinner
 with st.spinner('🚀 Initializing Analytics Engine... Scanning for Datasets...'):
-    data_dict, log_counts = load_data_recursive()
+    data_dict, log_counts, failed_files = load_data_recursive()
     df_e = data_dict['enrol']
     df_b = data_dict['bio']
     df_d = data_dict['demo']
 
+# Files that could not be parsed are skipped, but listed
+render_load_failures(failed_files)
+
 # Validation Check
 total_txns = len(df_e) + len(df_b) + len(df_d)
 if total_txns == 0:
@@ -154,6 +406,8 @@ if total_txns == 0:
     st.info("Please ensure the CSV files (api_data_aadhar_*.csv) are present in this folder or subfolders.")
     st.stop()
 
+facts = build_facts(df_e, df_b, df_d)
+
 
 # ==========================================
 # 3. SIDEBAR NAVIGATION
@@ -181,30 +435,6 @@ with st.sidebar:
     st.info(f"Demographic: {len(df_d):,} rows")
 
 
-# ==========================================
-# 4. HELPER: CONCEPT & STATEMENT RENDERER
-# ==========================================
-def render_explainer(concept_text, insight_text):
-    """
-    Renders the Concept (Math) and Statement (Insight) boxes side-by-side.
-    """
-    c1, c2 = st.columns(2)
-    with c1:
-        st.markdown(f"""
-        <div class='concept-box'>
-            <b>📐 Concept (The Methodology)</b><br>
-            {concept_text}
-        </div>
-        """, unsafe_allow_html=True)
-    with c2:
-        st.markdown(f"""
-        <div class='insight-box'>
-            <b>💡 Statement (The Insight)</b><br>
-            {insight_text}
-        </div>
-        """, unsafe_allow_html=True)
-
-
 # ==========================================
 # 5. PAGE LOGIC: EXECUTIVE SUMMARY
 # ==========================================
@@ -212,12 +442,11 @@ if menu == "Executive Summary":
     st.title("🇮🇳 Executive Summary: The Lifecycle Audit")
     st.markdown("### From Enrolment to Maintenance: Closing the Operational Intelligence Gap")
 
-    # High-Level KPIs
+    # High-Level KPIs (totals come precomputed with the other facts)
     k1, k2, k3, k4 = st.columns(4)
     
-    total_enrol = df_e[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum() if not df_e.empty else 0
-    total_updates = (df_b[['bio_age_5_17', 'bio_age_17_']].sum().sum() + 
-                     df_d[['demo_age_5_17', 'demo_age_17_']].sum().sum()) if not df_b.empty or not df_d.empty else 0
+    total_enrol = facts.total_enrol
+    total_updates = facts.total_updates
 
     with k1:
         st.metric("Total Transactions Analyzed", f"{total_txns / 1000000:.2f}M", "2025 Dataset")
@@ -282,63 +511,14 @@ elif menu == "Q1: Maintenance Gap (North-East Anomaly)":
 
     if not df_e.empty and (not df_b.empty or not df_d.empty):
         # Data Preparation
-        enrol_agg = df_e.groupby('state')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1)
-        update_agg = pd.Series(0, index=enrol_agg.index)
-
-        if not df_b.empty:
-            update_agg = update_agg.add(df_b.groupby('state')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1),
-                                        fill_value=0)
-        if not df_d.empty:
-            update_agg = update_agg.add(df_d.groupby('state')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1),
-                                        fill_value=0)
-
-        df_q1 = pd.DataFrame({'Enrolment': enrol_agg, 'Updates': update_agg}).dropna()
-        df_q1 = df_q1[df_q1['Enrolment'] > 1000]  # Filter small noise
+        df_q1 = session_cached('q1_matrix', maintenance_matrix, facts.state_enrol, facts.state_bio, facts.state_demo)
 
         # Quadrant Plot
-        fig = px.scatter(
-            df_q1,
-            x='Enrolment',
-            y='Updates',
-            hover_name=df_q1.index,
-            size='Enrolment',
-            color='Updates',
-            color_continuous_scale='RdYlGn',
-            title="State-wise Maintenance Matrix: The Danger Zone (Bottom-Right)"
-        )
-        # Add quadrant lines
-        fig.add_hline(y=df_q1['Updates'].mean(), line_dash="dash", line_color="gray", annotation_text="Avg Updates")
-        fig.add_vline(x=df_q1['Enrolment'].mean(), line_dash="dash", line_color="gray", annotation_text="Avg Enrolment")
-        
-        # Highlight key states (Meghalaya, Assam)
-        for state in ['Meghalaya', 'Assam']:
-            if state in df_q1.index:
-                fig.add_annotation(
-                    x=df_q1.loc[state, 'Enrolment'],
-                    y=df_q1.loc[state, 'Updates'],
-                    text=state,
-                    showarrow=True,
-                    arrowhead=1,
-                    font=dict(color="red", size=12)
-                )
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(maintenance_matrix_figure(df_q1), use_container_width=True)
         
         st.subheader("Adult Enrolment Share: The Catch-Up Phase")
-        state_stats = df_e.groupby('state')[['age_0_5', 'age_18_greater']].sum()
-        state_stats['Adult_Share'] = (state_stats['age_18_greater'] / state_stats.sum(axis=1)) * 100
-        top_states = state_stats.sort_values('Adult_Share', ascending=False).head(10)
-        
-        fig_ne = px.bar(
-            top_states,
-            x='Adult_Share',
-            y=top_states.index,
-            orientation='h',
-            title="Percentage of Enrolments that are Adults (18+)",
-            color='Adult_Share',
-            color_continuous_scale='Reds'
-        )
-        st.plotly_chart(fig_ne, use_container_width=True)
+        top_states = session_cached('q1_adult_share', adult_share_by_state, facts.state_enrol)
+        st.plotly_chart(adult_share_figure(top_states), use_container_width=True)
 
     else:
         st.error("Missing Enrolment or Update data for this analysis.")
@@ -356,26 +536,9 @@ elif menu == "Q2: Compliance Check (Digital Divide)":
 
     if not df_b.empty and not df_d.empty:
         # Aggregate by district
-        demo_dist = df_d.groupby('district')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1)
-        bio_dist = df_b.groupby('district')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1)
-
-        ratio_df = pd.DataFrame({'Demo': demo_dist, 'Bio': bio_dist}).fillna(0)
-        # Add 1 to denominator to avoid division by zero and smooth ratio
-        ratio_df['Ratio'] = ratio_df['Demo'] / (ratio_df['Bio'] + 1) 
-        ratio_df = ratio_df[ratio_df['Bio'] > 1000] # Filter districts with significant activity
-
-        top_ratio = ratio_df.sort_values('Ratio', ascending=False).head(15)
-
-        fig_div = px.bar(
-            top_ratio,
-            y=top_ratio.index,
-            x='Ratio',
-            orientation='h',
-            title="Top Districts by Digital Divide Ratio (Demo:Bio)",
-            color='Ratio',
-            color_continuous_scale='Oranges'
-        )
-        st.plotly_chart(fig_div, use_container_width=True)
+        top_ratio = session_cached('q2_digital_divide', digital_divide, facts.district_demo, facts.district_bio)
+
+        st.plotly_chart(digital_divide_figure(top_ratio), use_container_width=True)
         
         st.warning("Recommendation: Launch mobile biometric update vans in these high-ratio districts to close the compliance gap.")
 
@@ -395,34 +558,9 @@ elif menu == "Q3: Urban vs Rural (Border Velocity)":
 
     if not df_e.empty:
         # Aggregating Data
-        dist_agg = df_e.groupby(['state', 'district'])[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(
-            name='New_Enrolments')
-        top_districts = dist_agg.sort_values('New_Enrolments', ascending=False).head(15)
-
-        # Color coding for plot
-        def get_color(row):
-            # Based on the user's previous analysis
-            border_districts = ['Sitamarhi', 'Bahraich', 'Murshidabad', 'West Champaran', 'East Champaran', 'North 24 Parganas']
-            if row['district'] in border_districts:
-                return 'Border Zone'
-            elif row['district'] in ['Thane', 'Pune', 'Bengaluru', 'Jaipur', 'Agra']:
-                return 'Metro Hub'
-            else:
-                return 'Other'
-
-        top_districts['Zone'] = top_districts.apply(get_color, axis=1)
-
-        fig = px.bar(
-            top_districts,
-            x='district',
-            y='New_Enrolments',
-            color='Zone',
-            color_discrete_map={'Border Zone': '#ff4b4b', 'Metro Hub': '#2196f3', 'Other': '#bdc3c7'},
-            title="Top 15 Districts by Enrolment Volume (Highlighting Border Zones)",
-            text_auto='.2s'
-        )
-        fig.update_layout(xaxis_title="District", yaxis_title="Total New Enrolments")
-        st.plotly_chart(fig, use_container_width=True)
+        top_districts = session_cached('q3_top_districts', top_districts_by_enrolments, facts.district_enrol)
+
+        st.plotly_chart(border_velocity_figure(top_districts), use_container_width=True)
 
     else:
         st.error("No Enrolment Data Found for Border Velocity Analysis.")
@@ -441,15 +579,7 @@ elif menu == "Q4: Anomaly Detection (Temporal Spikes)":
     
     if not df_e.empty:
         # Monthly Trend (The August Gap)
-        monthly_load = df_e.set_index('date').resample('M').sum(numeric_only=True).sum(axis=1)
-        
-        fig_month = px.area(
-            x=monthly_load.index,
-            y=monthly_load.values,
-            title='Yearly Timeline: The "August Blackout" & "September Surge" (Enrolment Data)',
-            color_discrete_sequence=['#ff4b4b']
-        )
-        st.plotly_chart(fig_month, use_container_width=True)
+        st.plotly_chart(enrolment_timeline_figure(facts.monthly_e), use_container_width=True)
 
     st.subheader("Predictive Indicator: The Parent-Child Correlation")
     render_explainer(
@@ -464,22 +594,9 @@ elif menu == "Q4: Anomaly Detection (Temporal Spikes)":
     
     # Simple plot to show the two trends together (if possible)
     if not df_e.empty and not df_d.empty:
-        # Aggregate 0-5 enrolments
-        child_enrol = df_e.groupby('state')['age_0_5'].sum().rename('Child_Enrolment')
-        # Aggregate adult demo updates
-        adult_demo_update = df_d.groupby('state')['demo_age_17_'].sum().rename('Adult_Demo_Update')
+        corr_df = session_cached('q4_parent_child', parent_child_frame, facts.state_enrol, facts.state_demo_17)
         
-        corr_df = pd.concat([child_enrol, adult_demo_update], axis=1).dropna()
-        
-        fig_corr = px.scatter(
-            corr_df,
-            x='Adult_Demo_Update',
-            y='Child_Enrolment',
-            hover_name=corr_df.index,
-            title="Correlation: Adult Demographic Updates vs. Infant Enrolments (0-5)",
-            color_discrete_sequence=['#55a868']
-        )
-        st.plotly_chart(fig_corr, use_container_width=True)
+        st.plotly_chart(parent_child_figure(corr_df), use_container_width=True)
 
 
 # ==========================================
@@ -496,25 +613,7 @@ elif menu == "Q5: Load Forecasting (Weekly/Yearly Cycle)":
 
     if not df_d.empty:
         # 1. Weekly Trend
-        df_d['weekday'] = df_d['date'].dt.day_name()
-        weekly_load = df_d.groupby('weekday').sum(numeric_only=True).sum(axis=1)
-
-        # Sort days
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekly_load = weekly_load.reindex(days)
-
-        fig_week = px.line(
-            x=weekly_load.index,
-            y=weekly_load.values,
-            markers=True,
-            title='Weekly Load Distribution: The "Double Spike" Pattern (Demographic Data)',
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig_week.update_traces(line_width=4)
-        fig_week.add_annotation(x='Tuesday', y=weekly_load.get('Tuesday', 0), text="Tuesday Surge", showarrow=True)
-        fig_week.add_annotation(x='Saturday', y=weekly_load.get('Saturday', 0), text="Weekend Crush", showarrow=True)
-
-        st.plotly_chart(fig_week, use_container_width=True)
+        st.plotly_chart(weekly_load_figure(facts.weekday_d), use_container_width=True)
         
         st.success("Recommendation: Implement automated server auto-scaling on **Tuesday (10 AM)** and **Saturday (9 AM)**.")
 
@@ -526,16 +625,7 @@ elif menu == "Q5: Load Forecasting (Weekly/Yearly Cycle)":
     
     if not df_d.empty:
         # Monthly Trend (The March Madness)
-        monthly_load_d = df_d.set_index('date').resample('M').sum(numeric_only=True).sum(axis=1)
-        
-        fig_month_d = px.bar(
-            x=monthly_load_d.index,
-            y=monthly_load_d.values,
-            title='Yearly Timeline: March Madness (Demographic Data)',
-            color=monthly_load_d.values,
-            color_continuous_scale='Viridis'
-        )
-        st.plotly_chart(fig_month_d, use_container_width=True)
+        st.plotly_chart(demographic_timeline_figure(facts.monthly_d), use_container_width=True)
 
 
 # ==========================================
@@ -545,33 +635,41 @@ elif menu == "Data Inspector":
     st.title("🔍 Data Inspector")
     st.markdown("Filter and explore the raw data used for this analysis.")
 
-    dataset_choice = st.selectbox("Select Dataset", ["Enrolment", "Biometric Updates", "Demographic Updates"])
+    # Only this block reruns on inspector interactions, not the whole page
+    @st.fragment
+    def data_inspector():
+        dataset_choice = st.selectbox("Select Dataset", ["Enrolment", "Biometric Updates", "Demographic Updates"])
 
-    target_df = pd.DataFrame()
-    if dataset_choice == "Enrolment":
-        target_df = df_e
-    elif dataset_choice == "Biometric Updates":
-        target_df = df_b
-    else:
-        target_df = df_d
+        target_df = pd.DataFrame()
+        if dataset_choice == "Enrolment":
+            target_df = df_e
+        elif dataset_choice == "Biometric Updates":
+            target_df = df_b
+        else:
+            target_df = df_d
+
+        if not target_df.empty:
+            # Simple Filter (options come straight from the categorical, no column scan)
+            states = []
+            if 'state' in target_df.columns:
+                states = st.multiselect("Filter by State", target_df['state'].cat.categories)
 
-    if not target_df.empty:
-        # Simple Filter
-        if 'state' in target_df.columns:
-            states = st.multiselect("Filter by State", target_df['state'].unique())
             if states:
-                target_df = target_df[target_df['state'].isin(states)]
-
-        st.dataframe(target_df.head(1000), use_container_width=True)
-
-        # Download Button
-        csv = target_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            "Download Filtered Data",
-            csv,
-            "filtered_data.csv",
-            "text/csv",
-            key='download-csv'
-        )
-    else:
-        st.warning(f"{dataset_choice} dataset is empty.")
+                # isin on a categorical compares integer codes; only the previewed rows are materialized
+                rows = np.flatnonzero(target_df['state'].isin(states).to_numpy())
+                st.dataframe(target_df.iloc[rows[:1000]], use_container_width=True)
+            else:
+                st.dataframe(target_df.head(1000), use_container_width=True)
+
+            # Download Button (bytes work on every Streamlit release; the encoding is cached per selection)
+            st.download_button(
+                "Download Filtered Data",
+                filtered_csv(target_df, dataset_choice, tuple(sorted(states))),
+                "filtered_data.csv",
+                "text/csv",
+                key='download-csv'
+            )
+        else:
+            st.warning(f"{dataset_choice} dataset is empty.")
+
+    data_inspector()
@@ -2,8 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import io
 import os
 import numpy as np
+from uidai_common import load_data_recursive, render_load_failures
 
 # ==========================================
 # 1. PAGE CONFIGURATION
@@ -34,93 +36,111 @@ st.markdown("""
 
 
 # ==========================================
-# 2. DATA LOADING ENGINE (SMART SEARCH)
+# 2. DATA LOADING ENGINE (SMART SEARCH, shared via uidai_common)
 # ==========================================
-@st.cache_data
-def load_data_recursive():
+
+
+def _row_total(df):
     """
-    Scans the ENTIRE current directory and all subfolders to find
-    CSV files matching the UIDAI keywords.
+    Per-row sum of the numeric columns, so grouped totals need a single-column groupby.
     """
-    data_store = {
-        "enrol": [],
-        "bio": [],
-        "demo": []
-    }
+    values = df.select_dtypes(include='number').to_numpy()
+    # Plain NumPy reduction over the 2-D block; integer counts accumulate in int64 like pandas does
+    return pd.Series(values.sum(axis=1, dtype=np.int64 if values.dtype.kind in 'iu' else None), index=df.index)
 
-    # 1. SCANNING FILES
-    current_dir = os.getcwd()
-    file_log = {"enrol": 0, "bio": 0, "demo": 0}
-
-    # Walk through all folders
-    for root, dirs, files in os.walk(current_dir):
-        for file in files:
-            if not file.endswith(".csv"):
-                continue
-
-            file_path = os.path.join(root, file)
-
-            # Match keywords
-            if "api_data_aadhar_enrolment" in file:
-                data_store["enrol"].append(file_path)
-            elif "api_data_aadhar_biometric" in file:
-                data_store["bio"].append(file_path)
-            elif "api_data_aadhar_demographic" in file:
-                data_store["demo"].append(file_path)
-
-    # 2. LOADING DATA
-    final_dfs = {}
-
-    for key, paths in data_store.items():
-        if not paths:
-            final_dfs[key] = pd.DataFrame()
-            continue
-
-        dfs = []
-        for p in paths:
-            try:
-                df = pd.read_csv(p)
-                # Quick Date Standardization
-                df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-                dfs.append(df)
-            except Exception as e:
-                continue
-
-        if dfs:
-            final_dfs[key] = pd.concat(dfs, ignore_index=True)
-            file_log[key] = len(dfs)
-        else:
-            final_dfs[key] = pd.DataFrame()
 
-    # 3. CLEANING DATA (State Names & Nulls)
-    state_map = {
-        'Westbengal': 'West Bengal', 'West  Bengal': 'West Bengal',
-        'Uttaranchal': 'Uttarakhand', 'Orissa': 'Odisha',
-        'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra and Nagar Haveli'
-    }
+# Grouped totals reused across pages; every entry is a small Series/frame (None if its dataset is empty)
+@st.cache_resource(show_spinner=False)
+def build_summaries(df_enrol, df_bio, df_demo):
+    """
+    Computes every per-state, per-district and per-date total once per dataset.
+    """
+    summaries = dict.fromkeys([
+        'district_enrol', 'state_ages_enrol', 'district_bio', 'district_demo', 'weekday_demo', 'monthly_demo'
+    ])
+    # KPI totals of every numeric cell, taken from the row totals below (0 for an empty dataset)
+    summaries.update(total_enrol=0, total_bio=0, total_demo=0)
+
+    if not df_enrol.empty:
+        enrol_total = _row_total(df_enrol)
+        summaries['total_enrol'] = enrol_total.sum()
+        summaries['district_enrol'] = enrol_total.groupby(
+            [df_enrol['state'], df_enrol['district']], observed=True).sum()
+        summaries['state_ages_enrol'] = df_enrol.groupby('state', observed=True)[['age_0_5', 'age_18_greater']].sum()
 
-    for key in final_dfs:
-        df = final_dfs[key]
-        if not df.empty and 'state' in df.columns:
-            df['state'] = df['state'].replace(state_map)
-            df['state'] = df['state'].str.strip().str.title()
+    if not df_bio.empty:
+        bio_total = _row_total(df_bio)
+        summaries['total_bio'] = bio_total.sum()
+        summaries['district_bio'] = bio_total.groupby(df_bio['district'], observed=True).sum()
 
-            # Fill numeric nulls with 0
-            num_cols = df.select_dtypes(include=['number']).columns
-            df[num_cols] = df[num_cols].fillna(0)
-            final_dfs[key] = df
+    if not df_demo.empty:
+        demo_total = _row_total(df_demo)
+        summaries['total_demo'] = demo_total.sum()
+        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        summaries['district_demo'] = demo_total.groupby(df_demo['district'], observed=True).sum()
+        # Group on the 0-6 weekday code and attach the names afterwards (no per-row strings)
+        weekday_load = demo_total.groupby(df_demo['date'].dt.weekday.to_numpy()).sum()
+        summaries['weekday_demo'] = weekday_load.reindex(range(7)).set_axis(days)
+        summaries['monthly_demo'] = demo_total.set_axis(df_demo['date']).resample('ME').sum()
+
+    return summaries
 
-    return final_dfs, file_log
+
+# Page views are cached so widget reruns only do a dictionary lookup
+@st.cache_data(show_spinner=False)
+def top_districts_by_enrolments(dist_totals, n=15):
+    """
+    Districts with the highest total enrolment volume.
+    """
+    dist_agg = dist_totals.reset_index(name='New_Enrolments')
+    return dist_agg.sort_values('New_Enrolments', ascending=False).head(n)
+
+
+@st.cache_data(show_spinner=False)
+def adult_share_by_state(state_stats, n=10):
+    """
+    States with the highest share of adult (18+) enrolments.
+    """
+    state_stats = state_stats.copy()
+    state_stats['Adult_Share'] = (state_stats['age_18_greater'] / state_stats.sum(axis=1)) * 100
+    return state_stats.sort_values('Adult_Share', ascending=False).head(n)
+
+
+@st.cache_data(show_spinner=False)
+def digital_divide_ratio(demo_count, bio_count, n=10):
+    """
+    Districts with the highest demographic-to-biometric update ratio.
+    """
+    ratio_df = pd.DataFrame({'Demo': demo_count, 'Bio': bio_count}).fillna(0)
+    ratio_df['Ratio'] = ratio_df['Demo'] / (ratio_df['Bio'] + 1)
+    ratio_df = ratio_df[ratio_df['Bio'] > 100]  # Filter small noise
+    return ratio_df.sort_values('Ratio', ascending=False).head(n)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def filtered_csv(_df, dataset_choice, states):
+    """
+    CSV bytes of the inspector view, written straight into one bytes buffer.
+    The frame itself is not hashed; the dataset and state selection are the cache key.
+    """
+    if states:
+        _df = _df[_df['state'].isin(states)]
+    buf = io.BytesIO()
+    _df.to_csv(buf, index=False, encoding='utf-8')
+    return buf.getvalue()
 
 
 # Execute Load
 with st.spinner('🚀 Scanning folders for UIDAI datasets...'):
-    data_dict, log_counts = load_data_recursive()
+    data_dict, log_counts, failed_files = load_data_recursive()
 
 df_enrol = data_dict['enrol']
 df_bio = data_dict['bio']
 df_demo = data_dict['demo']
 
+# Files that could not be parsed are skipped, but listed
+render_load_failures(failed_files)
+
 # Check if data loaded
 total_files = sum(log_counts.values())
 if total_files == 0:
@@ -130,6 +150,8 @@ if total_files == 0:
         "Expected filenames should contain: `api_data_aadhar_enrolment`, `api_data_aadhar_biometric`, or `api_data_aadhar_demographic`.")
     st.stop()
 
+summaries = build_summaries(df_enrol, df_bio, df_demo)
+
 # ==========================================
 # 3. DASHBOARD SIDEBAR
 # ==========================================
@@ -166,9 +188,8 @@ if page == "Executive Summary":
     # KPI Row
     c1, c2, c3, c4 = st.columns(4)
 
-    total_enrol = df_enrol.select_dtypes(include='number').sum().sum() if not df_enrol.empty else 0
-    total_updates = (df_bio.select_dtypes(include='number').sum().sum() +
-                     df_demo.select_dtypes(include='number').sum().sum()) if not df_bio.empty else 0
+    total_enrol = summaries['total_enrol']
+    total_updates = (summaries['total_bio'] + summaries['total_demo']) if not df_bio.empty else 0
 
     with c1:
         st.metric("Total Transactions", f"{(total_enrol + total_updates) / 1000000:.1f}M", "2025 Data")
@@ -226,9 +247,7 @@ elif page == "Border Security":
 
     if not df_enrol.empty:
         # Aggregating Data
-        dist_agg = df_enrol.groupby(['state', 'district']).sum(numeric_only=True).sum(axis=1).reset_index(
-            name='New_Enrolments')
-        top_districts = dist_agg.sort_values('New_Enrolments', ascending=False).head(15)
+        top_districts = top_districts_by_enrolments(summaries['district_enrol'])
 
 
         # Color coding for plot
@@ -265,12 +284,7 @@ elif page == "Ops Efficiency":
 
     if not df_demo.empty:
         # 1. Weekly Trend
-        df_demo['weekday'] = df_demo['date'].dt.day_name()
-        weekly_load = df_demo.groupby('weekday').sum(numeric_only=True).sum(axis=1)
-
-        # Sort days
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekly_load = weekly_load.reindex(days)
+        weekly_load = summaries['weekday_demo']
 
         fig_week = px.line(
             x=weekly_load.index,
@@ -285,7 +299,7 @@ elif page == "Ops Efficiency":
         st.plotly_chart(fig_week, use_container_width=True)
 
         # 2. Monthly Trend (The August Gap)
-        monthly_load = df_demo.set_index('date').resample('M').sum(numeric_only=True).sum(axis=1)
+        monthly_load = summaries['monthly_demo']
 
         fig_month = px.area(
             x=monthly_load.index,
@@ -311,9 +325,7 @@ elif page == "Societal Trends":
     with tab1:
         st.markdown("### The 'Hidden Adult' Cohort")
         if not df_enrol.empty:
-            state_stats = df_enrol.groupby('state')[['age_0_5', 'age_18_greater']].sum()
-            state_stats['Adult_Share'] = (state_stats['age_18_greater'] / state_stats.sum(axis=1)) * 100
-            top_states = state_stats.sort_values('Adult_Share', ascending=False).head(10)
+            top_states = adult_share_by_state(summaries['state_ages_enrol'])
 
             fig_ne = px.bar(
                 top_states,
@@ -333,15 +345,8 @@ elif page == "Societal Trends":
         st.markdown("Ratio of **Demographic Updates** (Phone/Address) to **Biometric Updates**.")
 
         if not df_bio.empty and not df_demo.empty:
-            # Calculate simple ratio per state/district for Top 10
-            demo_count = df_demo.groupby('district').sum(numeric_only=True).sum(axis=1)
-            bio_count = df_bio.groupby('district').sum(numeric_only=True).sum(axis=1)
-
-            ratio_df = pd.DataFrame({'Demo': demo_count, 'Bio': bio_count}).fillna(0)
-            ratio_df['Ratio'] = ratio_df['Demo'] / (ratio_df['Bio'] + 1)
-            ratio_df = ratio_df[ratio_df['Bio'] > 100]  # Filter small noise
-
-            top_ratio = ratio_df.sort_values('Ratio', ascending=False).head(10)
+            # Calculate simple ratio per district for Top 10
+            top_ratio = digital_divide_ratio(summaries['district_demo'], summaries['district_bio'])
 
             fig_div = px.bar(
                 top_ratio,
@@ -375,15 +380,17 @@ elif page == "Raw Data Inspector":
         target_df = df_demo
 
     if not target_df.empty:
-        # Simple Filter
-        states = st.multiselect("Filter by State", target_df['state'].unique())
+        # Simple Filter (options come straight from the categorical, no column scan)
+        states = st.multiselect("Filter by State", target_df['state'].cat.categories)
         if states:
-            target_df = target_df[target_df['state'].isin(states)]
-
-        st.dataframe(target_df.head(1000), use_container_width=True)
+            # isin on a categorical compares integer codes; only the previewed rows are materialized
+            rows = np.flatnonzero(target_df['state'].isin(states).to_numpy())
+            st.dataframe(target_df.iloc[rows[:1000]], use_container_width=True)
+        else:
+            st.dataframe(target_df.head(1000), use_container_width=True)
 
         # Download Button
-        csv = target_df.to_csv(index=False).encode('utf-8')
+        csv = filtered_csv(target_df, dataset_choice, tuple(sorted(states)))  # selection order is not part of the key
         st.download_button(
             "Download Filtered Data",
             csv,
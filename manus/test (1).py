@@ -1,13 +1,25 @@
 import pandas as pd
+import matplotlib
+# Agg backend: the figure_<N> PNGs are drawn in pool workers, which have no display
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 import glob
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+plt.ioff()
 
-# Set a consistent style for better presentation
+# The shared plot helpers live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from uidai_plots import reset_figure  # noqa: E402
+
+# Set a consistent style for better presentation (once per process, shared by every figure)
 plt.style.use('seaborn-v0_8-whitegrid')
 
+# The seven figures are flat-colour charts, which zlib level 1 still packs well and much faster
+PNG_OPTIONS = {'pil_kwargs': {'compress_level': 1}}
+
 # ==========================================
 # 1. DATA LOADING & PREPROCESSING UTILS
 # ==========================================
@@ -21,7 +33,7 @@ plt.style.use('seaborn-v0_8-whitegrid')
 # 2. VISUALIZATION FUNCTIONS
 # ==========================================
 
-def plot_border_anomaly():
+def plot_border_anomaly(fig):
     """
     Generates Figure 1: Border District Velocity.
     Highlights the disproportionate enrolment in border zones.
@@ -32,24 +44,21 @@ def plot_border_anomaly():
     values = [43688, 42232, 39338, 35911, 33540, 31763, 31146, 30980]
     colors = ['#4c72b0', '#c44e52', '#c44e52', '#c44e52', '#f58518', '#4c72b0', '#4c72b0', '#4c72b0'] # Custom colors for clarity
 
-    plt.figure(figsize=(12, 6))
-    bars = plt.bar(districts, values, color=colors)
+    ax = reset_figure(fig, (12, 6))
+    bars = ax.bar(districts, values, color=colors)
     
-    # Add labels to bars
-    for bar in bars:
-        yval = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2, yval + 500, f'{yval:,}', ha='center', va='bottom', fontsize=9)
+    # Add labels to bars (one bar_label call instead of a text per bar)
+    ax.bar_label(bars, labels=[f'{v:,}' for v in values], padding=3, fontsize=9)
 
-    plt.title('Figure 1: High Enrolment Velocity in Border Districts (Red)', fontsize=16, pad=20)
-    plt.ylabel('New Enrolments (Count)', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', linestyle='--', alpha=0.5)
-    plt.tight_layout()
-    plt.savefig('figure_1_border_anomaly.png')
-    plt.close()
+    ax.set_title('Figure 1: High Enrolment Velocity in Border Districts (Red)', fontsize=16, pad=20)
+    ax.set_ylabel('New Enrolments (Count)', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    ax.grid(axis='y', linestyle='--', alpha=0.5)
+    fig.tight_layout()
+    fig.savefig('figure_1_border_anomaly.png', **PNG_OPTIONS)
 
 
-def plot_operational_load():
+def plot_operational_load(fig):
     """
     Generates Figure 2: The Tuesday/Saturday Spike.
     Shows the weekly load distribution derived from full dataset.
@@ -58,27 +67,26 @@ def plot_operational_load():
     # Aggregated volume in Millions
     load = [4.5, 7.5, 4.1, 5.7, 4.9, 14.2, 3.3]
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(days, load, marker='o', linewidth=3, color='#1f77b4', zorder=2)
-    plt.fill_between(days, load, color='#1f77b4', alpha=0.1, zorder=1)
+    ax = reset_figure(fig, (10, 5))
+    ax.plot(days, load, marker='o', linewidth=3, color='#1f77b4', zorder=2, rasterized=True)
+    ax.fill_between(days, load, color='#1f77b4', alpha=0.1, zorder=1)
 
     # Highlight Spikes
-    plt.scatter(['Tuesday'], [7.5], marker='o', color='orange', s=150, zorder=3)
-    plt.scatter(['Saturday'], [14.2], marker='o', color='red', s=150, zorder=3)
+    ax.scatter(['Tuesday'], [7.5], marker='o', color='orange', s=150, zorder=3, rasterized=True)
+    ax.scatter(['Saturday'], [14.2], marker='o', color='red', s=150, zorder=3, rasterized=True)
     
     # Add text labels
     for i, (day, val) in enumerate(zip(days, load)):
-        plt.text(i, val + 0.5, f'{val}M', ha='center', va='bottom', fontsize=10)
+        ax.text(i, val + 0.5, f'{val}M', ha='center', va='bottom', fontsize=10)
 
-    plt.title('Figure 2: Weekly Operational Load - The "Double Spike" Pattern', fontsize=16, pad=20)
-    plt.ylabel('Transaction Volume (Millions)', fontsize=12)
-    plt.grid(True, axis='y')
-    plt.tight_layout()
-    plt.savefig('figure_2_operational_load.png')
-    plt.close()
+    ax.set_title('Figure 2: Weekly Operational Load - The "Double Spike" Pattern', fontsize=16, pad=20)
+    ax.set_ylabel('Transaction Volume (Millions)', fontsize=12)
+    ax.grid(True, axis='y')
+    fig.tight_layout()
+    fig.savefig('figure_2_operational_load.png', **PNG_OPTIONS)
 
 
-def plot_northeast_anomaly():
+def plot_northeast_anomaly(fig):
     """
     Generates Figure 3: Adult Enrolment Share.
     Contrasts National Average with North-East states.
@@ -87,23 +95,20 @@ def plot_northeast_anomaly():
     pct = [32.1, 9.9, 8.3, 5.8, 0.9]
     colors = ['#c44e52', '#c44e52', '#c44e52', '#4c72b0', '#55a868'] # Highlight anomalies in red
 
-    plt.figure(figsize=(10, 5))
-    bars = plt.barh(states, pct, color=colors)
+    ax = reset_figure(fig, (10, 5))
+    bars = ax.barh(states, pct, color=colors)
     
     # Add labels to bars
-    for bar in bars:
-        width = bar.get_width()
-        plt.text(width + 0.5, bar.get_y() + bar.get_height()/2, f'{width:.1f}%', va='center', fontsize=10)
+    ax.bar_label(bars, fmt='%.1f%%', padding=3, fontsize=10)
 
-    plt.title('Figure 3: % of New Enrolments that are Adults (18+)', fontsize=16, pad=20)
-    plt.xlabel('Percentage (%)', fontsize=12)
-    plt.gca().invert_yaxis() # Highest percentage at the top
-    plt.tight_layout()
-    plt.savefig('figure_3_northeast_anomaly.png')
-    plt.close()
+    ax.set_title('Figure 3: % of New Enrolments that are Adults (18+)', fontsize=16, pad=20)
+    ax.set_xlabel('Percentage (%)', fontsize=12)
+    ax.invert_yaxis() # Highest percentage at the top
+    fig.tight_layout()
+    fig.savefig('figure_3_northeast_anomaly.png', **PNG_OPTIONS)
 
 
-def plot_digital_divide():
+def plot_digital_divide(fig):
     """
     Generates Figure 4: The Digital Divide.
     Compares Demographic vs Biometric update ratios.
@@ -112,46 +117,40 @@ def plot_digital_divide():
     ratios = [19.9, 15.5, 1.2, 1.1]  # Derived from "Digital_Drive_Ratio"
     colors = ['#c44e52', '#c44e52', '#4c72b0', '#4c72b0']
 
-    plt.figure(figsize=(10, 5))
-    bars = plt.bar(regions, ratios, color=colors)
+    ax = reset_figure(fig, (10, 5))
+    bars = ax.bar(regions, ratios, color=colors)
     
     # Add labels
-    for bar in bars:
-        yval = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2, yval + 0.5, f'{yval:.1f}:1', ha='center', va='bottom', fontsize=10)
+    ax.bar_label(bars, fmt='%.1f:1', padding=3, fontsize=10)
 
-    plt.title('Figure 4: The Digital Divide (Demographic vs Biometric Ratio)', fontsize=16, pad=20)
-    plt.ylabel('Ratio (Demo Updates per 1 Bio Update)', fontsize=12)
-    plt.xticks(rotation=15, ha='right')
-    plt.tight_layout()
-    plt.savefig('figure_4_digital_divide.png')
-    plt.close()
+    ax.set_title('Figure 4: The Digital Divide (Demographic vs Biometric Ratio)', fontsize=16, pad=20)
+    ax.set_ylabel('Ratio (Demo Updates per 1 Bio Update)', fontsize=12)
+    plt.setp(ax.get_xticklabels(), rotation=15, ha='right')
+    fig.tight_layout()
+    fig.savefig('figure_4_digital_divide.png', **PNG_OPTIONS)
 
 
-def plot_temporal_anomaly():
+def plot_temporal_anomaly(fig):
     """
     Generates Figure 5: August Blackout & September Surge.
     """
     months = ['June', 'July', 'August', 'September', 'October']
     volume = [0.21, 0.61, 0.0, 1.47, 0.81]  # Millions
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(months, volume, color='black', linestyle='--', marker='o', zorder=2)
-    bars = plt.bar(months, volume, color=['#4c72b0', '#4c72b0', '#c44e52', '#f58518', '#4c72b0'], alpha=0.7, zorder=1)
+    ax = reset_figure(fig, (10, 5))
+    ax.plot(months, volume, color='black', linestyle='--', marker='o', zorder=2)
+    bars = ax.bar(months, volume, color=['#4c72b0', '#4c72b0', '#c44e52', '#f58518', '#4c72b0'], alpha=0.7, zorder=1)
     
     # Add labels
-    for bar in bars:
-        yval = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2, yval + 0.05, f'{yval:.2f}M', ha='center', va='bottom', fontsize=10)
+    ax.bar_label(bars, fmt='%.2fM', padding=3, fontsize=10)
 
-    plt.title('Figure 5: The "August Blackout" and Recovery Surge', fontsize=16, pad=20)
-    plt.ylabel('Enrolments (Millions)', fontsize=12)
-    plt.tight_layout()
-    plt.savefig('figure_5_temporal_anomaly.png')
-    plt.close()
+    ax.set_title('Figure 5: The "August Blackout" and Recovery Surge', fontsize=16, pad=20)
+    ax.set_ylabel('Enrolments (Millions)', fontsize=12)
+    fig.tight_layout()
+    fig.savefig('figure_5_temporal_anomaly.png', **PNG_OPTIONS)
 
 
-def plot_correlation_matrix():
+def plot_correlation_matrix(fig):
     """
     Generates correlation matrix heatmap.
     Confirming link between Adult Demo Updates and Child Enrolment.
@@ -166,15 +165,28 @@ def plot_correlation_matrix():
     corr_df = pd.DataFrame(data, index=['Adult_Demo_Updates', 'Child_Enrolments',
                                         'Biometric_Updates', 'Adult_Enrolments'])
 
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(corr_df, annot=True, cmap='coolwarm', vmin=-1, vmax=1, fmt=".2f", linewidths=.5, linecolor='black')
-    plt.title('Figure 6: Correlation Matrix - Predictive Indicators', fontsize=16, pad=20)
-    plt.tight_layout()
-    plt.savefig('figure_6_correlation_matrix.png')
-    plt.close()
-
-
-def plot_maintenance_mode():
+    ax = reset_figure(fig, (8, 6))
+    # Annotated heatmap drawn directly: one mesh cell per pair, its value written in the middle
+    mesh = ax.pcolormesh(corr_df.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1, edgecolors='black', linewidth=.5)
+    fig.colorbar(mesh, ax=ax)
+    for (row, col), value in np.ndenumerate(corr_df.to_numpy()):
+        # Text colour picked by the cell's relative luminance (linearised sRGB), as seaborn does
+        rgb = np.asarray(mesh.cmap(mesh.norm(value))[:3])
+        linear = np.where(rgb <= .03928, rgb / 12.92, ((rgb + .055) / 1.055) ** 2.4)
+        ax.text(col + 0.5, row + 0.5, f'{value:.2f}', ha='center', va='center',
+                color='white' if linear @ [.2126, .7152, .0722] < .408 else '.15')
+    ax.set_xticks(np.arange(len(corr_df.columns)) + 0.5, corr_df.columns, rotation=90)
+    ax.set_yticks(np.arange(len(corr_df.index)) + 0.5, corr_df.index)
+    ax.invert_yaxis()  # first row at the top
+    ax.grid(False)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.set_title('Figure 6: Correlation Matrix - Predictive Indicators', fontsize=16, pad=20)
+    fig.tight_layout()
+    fig.savefig('figure_6_correlation_matrix.png', **PNG_OPTIONS)
+
+
+def plot_maintenance_mode(fig):
     """
     Generates trend line for Age 0-5 vs Age 5-17.
     """
@@ -182,17 +194,37 @@ def plot_maintenance_mode():
     age_0_5 = [0.99, 0.56, 0.76, 0.56]  # Millions
     age_5_17 = [0.46, 0.23, 0.29, 0.18]  # Millions
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(months, age_0_5, label='Age 0-5 (Newborns)', marker='o', linewidth=3, color='#55a868')
-    plt.plot(months, age_5_17, label='Age 5-17 (School)', marker='x', linestyle='--', linewidth=3, color='#c44e52')
+    ax = reset_figure(fig, (10, 5))
+    ax.plot(months, age_0_5, label='Age 0-5 (Newborns)', marker='o', linewidth=3, color='#55a868')
+    ax.plot(months, age_5_17, label='Age 5-17 (School)', marker='x', linestyle='--', linewidth=3, color='#c44e52')
     
-    plt.title('Figure 7: The Shift to "Maintenance Mode" (Newborn Dominance)', fontsize=16, pad=20)
-    plt.ylabel('Enrolments (Millions)', fontsize=12)
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig('figure_7_maintenance_mode.png')
-    plt.close()
+    ax.set_title('Figure 7: The Shift to "Maintenance Mode" (Newborn Dominance)', fontsize=16, pad=20)
+    ax.set_ylabel('Enrolments (Millions)', fontsize=12)
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig('figure_7_maintenance_mode.png', **PNG_OPTIONS)
+
+
+_figure = None
+
+
+def _init_worker():
+    """
+    Creates the single figure a worker process reuses for all of its plots.
+    """
+    global _figure
+    _figure = plt.figure()
+
+
+def run_plot(plot):
+    """
+    Runs one plot function on this worker's figure, then blanks it (also after an error).
+    """
+    try:
+        plot(_figure)
+    finally:
+        _figure.clear()
 
 
 # ==========================================
@@ -203,13 +235,12 @@ if __name__ == "__main__":
     # The actual data loading logic is in the Streamlit app.
     print("Generating Analysis Plots...")
 
-    # Run all visualizations
-    plot_border_anomaly()
-    plot_operational_load()
-    plot_northeast_anomaly()
-    plot_digital_divide()
-    plot_temporal_anomaly()
-    plot_correlation_matrix()
-    plot_maintenance_mode()
+    # Run all visualizations. Each worker process draws its plots one after another on its own
+    # reused figure, so different plots render (and PNG-encode) side by side across workers
+    plots = [plot_border_anomaly, plot_operational_load, plot_northeast_anomaly, plot_digital_divide,
+             plot_temporal_anomaly, plot_correlation_matrix, plot_maintenance_mode]
+    with ProcessPoolExecutor(max_workers=min(4, len(plots)), initializer=_init_worker) as pool:
+        for future in [pool.submit(run_plot, plot) for plot in plots]:
+            future.result()  # re-raise any plotting error here
 
     print("Analysis Complete. All charts saved as PNG files.")
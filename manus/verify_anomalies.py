@@ -1,22 +1,55 @@
 import pandas as pd
 import glob
 import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# The shared dataset helpers live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from uidai_data import parquet_snapshot  # noqa: E402
+
+# Rows per CSV chunk: memory stays bounded by one chunk of dates per file being read
+CHUNK_ROWS = 200_000
+
+
+def _year_month(dates):
+    # int year*100 + month key; only the few result labels become Periods
+    return dates.dt.year * 100 + dates.dt.month
+
+
+def _count_file_months(path):
+    """
+    Streams one CSV's date column in chunks and counts its rows per year-month.
+    """
+    counts = Counter()
+    for chunk in pd.read_csv(path, usecols=['date'], dtype={'date': str}, chunksize=CHUNK_ROWS):
+        # Malformed dates become NaT and drop out of the counts
+        dates = pd.to_datetime(chunk['date'], format='%d-%m-%Y', errors='coerce')
+        counts.update(_year_month(dates).dropna().astype(int).value_counts().to_dict())
+    return counts
+
 
 def check_monthly_counts(pattern, name):
-    files = glob.glob(pattern, recursive=True)
-    if not files:
-        print(f"No files found for {name}")
-        return
-    
-    dfs = []
-    for f in files:
-        df = pd.read_csv(f)
-        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-        dfs.append(df)
-    
-    master = pd.concat(dfs)
-    master['month'] = master['date'].dt.to_period('M')
-    counts = master.groupby('month').size()
+    # Prefer a current Parquet snapshot written by tools/to_parquet.py (only the date column is read)
+    parquet_dir = parquet_snapshot(name.lower(), os.path.dirname(os.path.dirname(pattern)))
+    if parquet_dir is not None:
+        dates = pd.read_parquet(parquet_dir, columns=['date'])['date']
+        counts = _year_month(dates).value_counts()
+    else:
+        files = glob.glob(pattern, recursive=True)
+        if not files:
+            print(f"No files found for {name}")
+            return
+
+        # Only a month histogram is kept; the files are streamed on parallel threads
+        with ThreadPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as pool:
+            counts = pd.Series(sum(pool.map(_count_file_months, files), Counter()), dtype='int64')
+
+    counts = counts.sort_index()
+    counts.name = None  # value_counts would print as 'Name: count'
+    keys = counts.index.to_numpy()
+    counts.index = pd.PeriodIndex.from_fields(year=keys // 100, month=keys % 100, freq='M').rename('month')
     print(f"\nMonthly counts for {name}:")
     print(counts)
 
@@ -1,13 +1,13 @@
 import pandas as pd
-import glob
+import os
+import sys
 
-def load_data(pattern):
-    files = glob.glob(pattern, recursive=True)
-    dfs = [pd.read_csv(f) for f in files]
-    return pd.concat(dfs)
+# The shared loader lives at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from uidai_data import load_dataset  # noqa: E402
 
 print("Loading Enrolment Data...")
-df_enrol = load_data('UIDAI_Dataset/api_data_aadhar_enrolment/*.csv')
+df_enrol = load_dataset('enrolment', ['state', 'district', 'age_0_5', 'age_5_17', 'age_18_greater'])
 
 # 1. North-East Anomaly
 state_stats = df_enrol.groupby('state')[['age_0_5', 'age_5_17', 'age_18_greater']].sum()
@@ -18,17 +18,23 @@ print(state_stats['Adult_Share'].sort_values(ascending=False).head(10))
 # 2. Border District Velocity
 dist_agg = df_enrol.groupby(['state', 'district']).size().reset_index(name='Transaction_Count')
 # Note: Transaction_Count is number of records, but we should sum the actual enrolment numbers
-dist_enrol = df_enrol.groupby(['state', 'district'])[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Total_Enrolments')
+# Row totals first, so the groupby aggregates a single column
+enrol_total = df_enrol[['age_0_5', 'age_5_17', 'age_18_greater']].to_numpy().sum(axis=1)
+dist_enrol = df_enrol.assign(total=enrol_total).groupby(['state', 'district'])['total'].sum().reset_index(name='Total_Enrolments')
 print("\nTop 15 Districts by Total Enrolments:")
 print(dist_enrol.sort_values('Total_Enrolments', ascending=False).head(15))
 
 # 3. Digital Divide (Demo vs Bio)
 print("\nLoading Demographic and Biometric Data...")
-df_demo = load_data('/home/ubuntu/hackathon_repo/UIDAI_Dataset/api_data_aadhar_demographic/*.csv')
-df_bio = load_data('/home/ubuntu/hackathon_repo/UIDAI_Dataset/api_data_aadhar_biometric/*.csv')
+df_demo = load_dataset('demographic', ['district', 'demo_age_5_17', 'demo_age_17_'],
+                       root='/home/ubuntu/hackathon_repo/UIDAI_Dataset')
+df_bio = load_dataset('biometric', ['district', 'bio_age_5_17', 'bio_age_17_'],
+                      root='/home/ubuntu/hackathon_repo/UIDAI_Dataset')
 
-demo_dist = df_demo.groupby('district')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1)
-bio_dist = df_bio.groupby('district')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1)
+demo_total = df_demo[['demo_age_5_17', 'demo_age_17_']].to_numpy().sum(axis=1)
+bio_total = df_bio[['bio_age_5_17', 'bio_age_17_']].to_numpy().sum(axis=1)
+demo_dist = df_demo.assign(total=demo_total).groupby('district')['total'].sum()
+bio_dist = df_bio.assign(total=bio_total).groupby('district')['total'].sum()
 
 ratio_df = pd.DataFrame({'Demo': demo_dist, 'Bio': bio_dist}).fillna(0)
 ratio_df['Ratio'] = ratio_df['Demo'] / (ratio_df['Bio'] + 1)
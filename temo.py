@@ -1,32 +1,30 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from glob import glob
+import re
+import calendar
+from uidai_data import STATE_MAP, canonical_labels, load_cached, load_dataset
 
 
 # ============== LOAD & PREPROCESS ==============
 def load_all_data():
-    """Loads all datasets and applies standardization."""
+    """Loads all datasets and applies standardization (or reuses an earlier run's result)."""
 
     def clean_df(df):
-        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-        state_map = {
-            'Westbengal': 'West Bengal', 'Uttaranchal': 'Uttarakhand',
-            'Orissa': 'Odisha'
-        }
-        df['state'] = df['state'].replace(state_map).str.strip().str.title()
+        # Labels become categoricals, so groupbys work on integer codes (counts are int32 from the schema)
+        df['state'] = canonical_labels(df['state'], STATE_MAP)
+        df['district'] = df['district'].astype('category')
         numeric_cols = df.select_dtypes(include=['number']).columns
         df[numeric_cols] = df[numeric_cols].fillna(0)
         return df
 
-    df_enrol = pd.concat([clean_df(pd.read_csv(f))
-                          for f in glob('UIDAI_Dataset/api_data_aadhar_enrolment/*enrolment*.csv')], ignore_index=True)
-    df_bio = pd.concat([clean_df(pd.read_csv(f))
-                        for f in glob('UIDAI_Dataset/api_data_aadhar_biometric/*biometric*.csv')], ignore_index=True)
-    df_demo = pd.concat([clean_df(pd.read_csv(f))
-                         for f in glob('UIDAI_Dataset/api_data_aadhar_demographic/*demographic*.csv')], ignore_index=True)
+    def build():
+        # Cleaned after the concat (done by load_dataset), so every file shares the same categories
+        df_enrol = clean_df(load_dataset('enrolment'))
+        # One combined count per row, so grouped enrolment totals aggregate a single column
+        df_enrol['total_enrol'] = df_enrol[['age_0_5', 'age_5_17', 'age_18_greater']].to_numpy().sum(axis=1)
+        return df_enrol, clean_df(load_dataset('biometric')), clean_df(load_dataset('demographic'))
 
-    return df_enrol, df_bio, df_demo
+    frames, _ = load_cached('temo', __file__, ['enrolment', 'biometric', 'demographic'], build)
+    return frames
 
 
 # ============== FEATURE ENGINEERING ==============
@@ -34,12 +32,12 @@ def engineer_features(df_enrol, df_bio, df_demo):
     """Creates derived ratios for analysis."""
 
     # Aggregate by state
-    state_enrol = df_enrol.groupby('state')[['age_0_5', 'age_5_17', 'age_18_greater']].sum()
+    state_enrol = df_enrol.groupby('state', observed=True)[['age_0_5', 'age_5_17', 'age_18_greater']].sum()
     state_enrol['adult_share_pct'] = (state_enrol['age_18_greater'] /
                                       state_enrol.sum(axis=1) * 100)
 
-    state_bio = df_bio.groupby('state')[['bio_age_18_greater']].sum()
-    state_demo = df_demo.groupby('state')[['demo_age_18_greater']].sum()
+    state_bio = df_bio.groupby('state', observed=True)[['bio_age_18_greater']].sum()
+    state_demo = df_demo.groupby('state', observed=True)[['demo_age_18_greater']].sum()
 
     merged = state_enrol.join([state_bio, state_demo])
     merged['digital_drive_ratio'] = (merged['demo_age_18_greater'] /
@@ -55,17 +53,20 @@ def detect_anomalies(df_enrol):
     border_districts = ['Sitamarhi', 'Bahraich', 'Murshidabad',
                         'South 24 Parganas', 'West Champaran']
 
-    district_enrol = df_enrol.groupby('district')[['age_0_5', 'age_5_17',
-                                                   'age_18_greater']].sum().sum(axis=1).sort_values(ascending=False)
+    district_enrol = df_enrol.groupby('district', observed=True)['total_enrol'].sum().sort_values(ascending=False)
 
     top_10 = district_enrol.head(10)
-    border_count = sum(1 for d in top_10.index if any(b in d for b in border_districts))
+    # One compiled alternation, matched as substrings across the labels in C
+    border_pattern = '|'.join(map(re.escape, border_districts))
+    border_count = int(top_10.index.to_series().str.contains(border_pattern, regex=True).sum())
 
     print(f"Border districts in top 10: {border_count}/10")
 
-    # Weekly pattern
-    df_enrol['weekday'] = df_enrol['date'].dt.day_name()
-    weekly_load = df_enrol.groupby('weekday').size()
+    # Weekly pattern, grouped on the weekday numbers (Monday=0) and labelled afterwards;
+    # rows with an unparseable (NaT) date have no weekday and drop out
+    weekdays = df_enrol['date'].dt.weekday
+    weekly_load = weekdays.groupby(weekdays).size()
+    weekly_load.index = pd.Index([calendar.day_name[int(d)] for d in weekly_load.index], name='weekday')
 
     return top_10, weekly_load
 
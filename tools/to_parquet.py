@@ -0,0 +1,58 @@
+"""
+One-time conversion of the raw UIDAI CSV exports into Parquet datasets.
+The analysis scripts read UIDAI_Dataset/parquet/<kind> instead of re-parsing the CSVs while it matches them.
+Run from the repository root: python tools/to_parquet.py
+"""
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+# The dataset helpers live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from uidai_data import SNAPSHOT_SIGNATURE, csv_files, source_signature  # noqa: E402
+
+SOURCE_ROOT = 'UIDAI_Dataset'
+PARQUET_ROOT = os.path.join(SOURCE_ROOT, 'parquet')
+
+# Count columns per dataset; every dataset also has date, state, district and pincode
+COUNT_COLUMNS = {
+    'enrolment': ['age_0_5', 'age_5_17', 'age_18_greater'],
+    'biometric': ['bio_age_5_17', 'bio_age_17_'],
+    'demographic': ['demo_age_5_17', 'demo_age_17_'],
+}
+
+
+def convert(kind):
+    """
+    Writes one dataset as Parquet (zstd, dictionary-encoded labels), partitioned by year_month.
+    """
+    files = csv_files(kind, SOURCE_ROOT)
+    if not files:
+        print(f"No CSV files found for {kind}")
+        return
+
+    column_types = {'date': pa.timestamp('s'), 'state': pa.string(), 'district': pa.string(), 'pincode': pa.int32()}
+    column_types.update((col, pa.int32()) for col in COUNT_COLUMNS[kind])
+    options = pv.ConvertOptions(column_types=column_types, timestamp_parsers=['%d-%m-%Y'])
+
+    # Taken before reading, so a CSV edited during the conversion leaves the snapshot stale
+    signature = source_signature(kind, SOURCE_ROOT)
+    table = pa.concat_tables([pv.read_csv(f, convert_options=options) for f in files])
+    table = table.append_column('year_month', pc.strftime(table['date'], format='%Y-%m'))
+
+    target = os.path.join(PARQUET_ROOT, kind)
+    pq.write_to_dataset(table, root_path=target, partition_cols=['year_month'],
+                        compression='zstd', existing_data_behavior='delete_matching')
+    # The loaders only trust the snapshot while this still matches the CSVs
+    with open(os.path.join(target, SNAPSHOT_SIGNATURE), 'w') as f:
+        f.write(signature)
+    print(f"✔ {kind}: {table.num_rows} rows from {len(files)} files -> {target}")
+
+
+if __name__ == "__main__":
+    for kind in COUNT_COLUMNS:
+        convert(kind)
@@ -1,10 +1,25 @@
 import pandas as pd
+import matplotlib
+# Agg backend: the q1-q5 answers are saved as q<N>.png instead of opening windows
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import seaborn as sns
-import glob
+import gc
 import numpy as np
-from datetime import timedelta
+from uidai_data import STATE_MAP, canonical_labels, load_cached, load_dataset
 
+# numba is optional: it compiles the Q4 spike scan into plain loops over the daily array
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+plt.ioff()
+
+# The Q4 daily series is one long line; Agg renders it in pieces of this many vertices
+plt.rcParams['agg.path.chunksize'] = 10000
+
+# q1-q5.png are quick-look outputs: screen resolution and the fastest zlib level are enough
+PNG_OPTIONS = {'dpi': 100, 'pil_kwargs': {'compress_level': 1}}
 
 # ==========================================
 # 1. DATA INGESTION & CLEANING
@@ -13,55 +28,103 @@ from datetime import timedelta
 def load_and_process_data():
     print("⏳ Loading Datasets...")
 
-    # Helper to load files
-    def load_files(pattern):
-        files = glob.glob(pattern)
-        dfs = []
-        for f in files:
-            try:
-                df = pd.read_csv(f)
-                df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
-                dfs.append(df)
-            except:
-                continue
-        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
-
-    # Load Data
-    df_enrol = load_files('UIDAI_Dataset/api_data_aadhar_enrolment/api_data_aadhar_enrolment_*.csv')
-    df_bio = load_files('UIDAI_Dataset/api_data_aadhar_biometric/api_data_aadhar_biometric_*.csv')
-    df_demo = load_files('UIDAI_Dataset/api_data_aadhar_demographic/api_data_aadhar_demographic_*.csv')
-
-    # Standardize State Names
-    state_map = {
-        'Westbengal': 'West Bengal', 'West  Bengal': 'West Bengal',
-        'Uttaranchal': 'Uttarakhand', 'Orissa': 'Odisha',
-        'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra and Nagar Haveli'
-    }
+    def build():
+        # Load Data (just the columns the five questions read; no question uses district)
+        df_enrol = load_dataset('enrolment', ['state', 'age_0_5', 'age_5_17', 'age_18_greater'])
+        df_bio = load_dataset('biometric', ['state', 'pincode', 'bio_age_5_17', 'bio_age_17_'])
+        df_demo = load_dataset('demographic', ['date', 'state', 'pincode', 'demo_age_5_17', 'demo_age_17_'])
+
+        for df in [df_enrol, df_bio, df_demo]:
+            if 'state' in df.columns:
+                # Standardize State Names; labels become categoricals, so groupbys work on integer codes
+                df['state'] = canonical_labels(df['state'], STATE_MAP)
+                # Fill numeric nulls
+                num_cols = df.select_dtypes(include=np.number).columns
+                df[num_cols] = df[num_cols].fillna(0)
+
+        # One combined count per row, so grouped totals aggregate a single column
+        for df, total, cols in [(df_enrol, 'total_enrol', ['age_0_5', 'age_5_17', 'age_18_greater']),
+                                (df_bio, 'total_bio', ['bio_age_5_17', 'bio_age_17_']),
+                                (df_demo, 'total_demo', ['demo_age_5_17', 'demo_age_17_'])]:
+            if not df.empty:
+                df[total] = df[cols].to_numpy().sum(axis=1)
+        return df_enrol, df_bio, df_demo
+
+    # Reuse the cleaned frames of an earlier run while its inputs are unchanged
+    (df_enrol, df_bio, df_demo), cached = load_cached('uidai', __file__, ['enrolment', 'biometric', 'demographic'],
+                                                      build)
+    source = "Loaded from cache" if cached else "Loaded"
+    print(f"✔ {source}: {len(df_enrol)} Enrolments, {len(df_bio)} Bio Updates, {len(df_demo)} Demo Updates")
+    return df_enrol, df_bio, df_demo
 
-    for df in [df_enrol, df_bio, df_demo]:
-        if 'state' in df.columns:
-            df['state'] = df['state'].replace(state_map).str.strip().str.title()
-            # Fill numeric nulls
-            num_cols = df.select_dtypes(include=np.number).columns
-            df[num_cols] = df[num_cols].fillna(0)
 
-    print(f"✔ Loaded: {len(df_enrol)} Enrolments, {len(df_bio)} Bio Updates, {len(df_demo)} Demo Updates")
-    return df_enrol, df_bio, df_demo
+def precompute_aggregates(df_enrol, df_bio, df_demo):
+    """
+    Every grouped total the five questions need, built in one pass per dataset and key.
+    The raw row-level frames can be released once this returns.
+    """
+    # Both datasets share one pincode category list, so their per-pincode totals are
+    # summed straight into aligned arrays by category code instead of being joined
+    pincodes = pd.CategoricalDtype(np.union1d(df_demo['pincode'].unique(), df_bio['pincode'].unique()))
+    demo_codes = pd.Categorical(df_demo['pincode'], dtype=pincodes).codes
+    bio_codes = pd.Categorical(df_bio['pincode'], dtype=pincodes).codes
+    n_pin = len(pincodes.categories)
+    demo_pin = np.bincount(demo_codes, weights=df_demo['demo_age_17_'].to_numpy(), minlength=n_pin)
+    bio_pin = np.bincount(bio_codes, weights=df_bio['bio_age_17_'].to_numpy(), minlength=n_pin)
+    # Keep the demographic pincodes only (the left side of the former join)
+    seen = np.bincount(demo_codes, minlength=n_pin) > 0
+
+    return {
+        'state_enrol': df_enrol.groupby('state', observed=True)[['total_enrol', 'age_5_17']].sum(),
+        'state_bio': df_bio.groupby('state', observed=True)[['total_bio', 'bio_age_5_17']].sum(),
+        'state_demo': df_demo.groupby('state', observed=True)[['total_demo']].sum(),
+        'pincode': pd.DataFrame({'demo_age_17_': demo_pin[seen].astype(np.int64),
+                                 'bio_age_17_': bio_pin[seen].astype(np.int64)},
+                                index=pd.Index(pincodes.categories[seen], name='pincode')),
+        'daily_demo': df_demo.groupby('date')[['total_demo', 'demo_age_17_']].sum(),
+    }
 
 
 # ==========================================
 # 2. ANALYTICAL VISUALIZATIONS (The 5 Questions)
 # ==========================================
 
-def q1_maintenance_gap(df_enrol, df_bio, df_demo):
+if njit is not None:
+    @njit(cache=True)
+    def _spike_mask(values, n_sigma):
+        """
+        Flags the values above mean + n_sigma * sample std, in two passes over the array.
+        """
+        n = values.shape[0]
+        total = 0.0
+        for i in range(n):
+            total += values[i]
+        mean = total / n
+        sq = 0.0
+        for i in range(n):
+            sq += (values[i] - mean) ** 2
+        limit = mean + n_sigma * np.sqrt(sq / (n - 1))
+        mask = np.empty(n, dtype=np.bool_)
+        for i in range(n):
+            mask[i] = values[i] > limit
+        return mask
+else:
+    def _spike_mask(values, n_sigma):
+        """
+        Flags the values above mean + n_sigma * sample std.
+        """
+        return values > values.mean() + n_sigma * values.std(ddof=1)
+
+
+def q1_maintenance_gap(agg):
     """
     Q1: Identify states where enrolment is high but updates are low.
     Metric: Maintenance Index
     """
     # Aggregation
-    enrol_agg = df_enrol.groupby('state')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1)
-    bio_agg = df_bio.groupby('state')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1)
-    demo_agg = df_demo.groupby('state')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1)
+    enrol_agg = agg['state_enrol']['total_enrol']
+    bio_agg = agg['state_bio']['total_bio']
+    demo_agg = agg['state_demo']['total_demo']
 
     df_combined = pd.DataFrame({'Enrolment': enrol_agg, 'Updates': bio_agg + demo_agg}).dropna()
 
@@ -69,30 +132,32 @@ def q1_maintenance_gap(df_enrol, df_bio, df_demo):
     df_combined = df_combined[df_combined['Enrolment'] > 1000]
 
     plt.figure(figsize=(10, 6))
-    sns.scatterplot(data=df_combined, x='Enrolment', y='Updates', s=100, color='blue', alpha=0.6)
+    plt.scatter(df_combined['Enrolment'], df_combined['Updates'], s=100, color='blue', alpha=0.6, edgecolors='white')
 
     # Highlight "Danger Zone" (High Enrolment, Low Updates)
-    for state, row in df_combined.iterrows():
-        # Label Outliers
-        if row['Enrolment'] > df_combined['Enrolment'].quantile(0.8) or row['Updates'] > df_combined[
-            'Updates'].quantile(0.8):
-            plt.text(row['Enrolment'] + 50, row['Updates'], state, fontsize=9)
+    enrol = df_combined['Enrolment'].to_numpy()
+    updates = df_combined['Updates'].to_numpy()
+    # Label Outliers (top-20% thresholds computed once, not per row)
+    outliers = (enrol > np.quantile(enrol, 0.8)) | (updates > np.quantile(updates, 0.8))
+    for state, x, y in zip(df_combined.index[outliers], enrol[outliers], updates[outliers]):
+        plt.text(x + 50, y, state, fontsize=9)
 
     plt.title('Q1: The "Maintenance Gap" (High Growth vs. Low Hygiene)', fontsize=14)
     plt.xlabel('Total New Enrolments (Growth)', fontsize=12)
     plt.ylabel('Total Updates (Maintenance)', fontsize=12)
     plt.grid(True, linestyle='--', alpha=0.6)
     plt.tight_layout()
-    plt.show()
+    plt.savefig('q1.png', **PNG_OPTIONS)
+    plt.close()
 
 
-def q2_compliance_ratio(df_enrol, df_bio):
+def q2_compliance_ratio(agg):
     """
     Q2: Age-wise enrolment growth vs demographic correction frequency.
     Focus: Age 5-17 (School Age)
     """
-    enrol_5_17 = df_enrol.groupby('state')['age_5_17'].sum()
-    bio_5_17 = df_bio.groupby('state')['bio_age_5_17'].sum()
+    enrol_5_17 = agg['state_enrol']['age_5_17']
+    bio_5_17 = agg['state_bio']['bio_age_5_17']
 
     df_comp = pd.DataFrame({'New_Kids': enrol_5_17, 'Mandatory_Updates': bio_5_17})
     df_comp = df_comp.sort_values('New_Kids', ascending=False).head(10)  # Top 10 States
@@ -103,76 +168,88 @@ def q2_compliance_ratio(df_enrol, df_bio):
     plt.xticks(rotation=45)
     plt.grid(axis='y', linestyle='--', alpha=0.5)
     plt.tight_layout()
-    plt.show()
+    plt.savefig('q2.png', **PNG_OPTIONS)
+    plt.close()
 
 
-def q3_urban_rural_divide(df_bio, df_demo):
+def q3_urban_rural_divide(agg):
     """
     Q3: Urban vs Rural behavior.
     Metric: Digital Ratio (Demo/Bio)
     """
-    # Group by Pincode
-    demo_pin = df_demo.groupby('pincode')[['demo_age_17_']].sum()
-    bio_pin = df_bio.groupby('pincode')[['bio_age_17_']].sum()
-
-    df_pin = demo_pin.join(bio_pin, lsuffix='_d', rsuffix='_b').fillna(0)
-    df_pin['Total_Vol'] = df_pin['demo_age_17_'] + df_pin['bio_age_17_']
+    # Pincode totals (already aligned, missing biometric totals are 0)
+    demo = agg['pincode']['demo_age_17_'].to_numpy()
+    bio = agg['pincode']['bio_age_17_'].to_numpy()
+    total = demo + bio
 
     # Filter valid data
-    df_pin = df_pin[df_pin['Total_Vol'] > 100]
-    df_pin['Digital_Ratio'] = df_pin['demo_age_17_'] / (df_pin['bio_age_17_'] + 1)
+    valid = total > 100
+    df_pin = agg['pincode'][valid].assign(Total_Vol=total[valid],
+                                          Digital_Ratio=demo[valid] / (bio[valid] + 1.0))
 
     # Define "Rural" vs "Urban" proxy by Volume (Top 10% volume = Urban)
     vol_90 = df_pin['Total_Vol'].quantile(0.9)
     df_pin['Category'] = np.where(df_pin['Total_Vol'] > vol_90, 'Urban (High Vol)', 'Rural (Low Vol)')
 
     plt.figure(figsize=(8, 6))
-    sns.boxplot(x='Category', y='Digital_Ratio', data=df_pin, palette="Set2")
+    # One box per category, in order of first appearance and coloured from the Set2 palette
+    names, ratios = zip(*[(name, group.to_numpy())
+                          for name, group in df_pin.groupby('Category', sort=False)['Digital_Ratio']])
+    boxes = plt.boxplot(ratios, patch_artist=True, widths=0.8)['boxes']
+    for box, color in zip(boxes, plt.get_cmap('Set2').colors):
+        box.set_facecolor(color)
+    plt.xticks(range(1, len(names) + 1), names)
+    plt.xlabel('Category')
     plt.title('Q3: The Digital Divide (Ratio of Phone Updates to Biometric Updates)', fontsize=14)
     plt.ylabel('Digital Ratio (Phone Updates per 1 Bio Update)', fontsize=12)
     plt.ylim(0, 20)  # Limit y-axis to remove extreme outliers for readability
-    plt.show()
+    plt.savefig('q3.png', **PNG_OPTIONS)
+    plt.close()
 
 
-def q4_load_volatility(df_demo):
+def q4_load_volatility(agg):
     """
     Q4: Detect anomalies where updates spike unusually.
     Metric: Daily Volume
     """
-    daily_load = df_demo.groupby('date')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1)
+    daily_load = agg['daily_demo']['total_demo']
 
     # Identify Spikes (Mean + 2 Std Dev)
-    limit = daily_load.mean() + (2 * daily_load.std())
-    spikes = daily_load[daily_load > limit]
+    spikes = daily_load[_spike_mask(daily_load.to_numpy(dtype=np.float64), 2.0)]
 
     plt.figure(figsize=(12, 6))
-    plt.plot(daily_load.index, daily_load.values, label='Daily Transactions', color='grey', alpha=0.7)
-    plt.scatter(spikes.index, spikes.values, color='red', label='Anomalies (>2σ)', s=50, zorder=5)
+    # Rasterized so a dense series stays one bitmap instead of thousands of vector segments
+    plt.plot(daily_load.index, daily_load.values, label='Daily Transactions', color='grey', alpha=0.7,
+             rasterized=True)
+    plt.scatter(spikes.index, spikes.values, color='red', label='Anomalies (>2σ)', s=50, zorder=5,
+                rasterized=True)
 
     plt.title('Q4: Operational Anomalies & Load Volatility (2025)', fontsize=14)
     plt.ylabel('Transactions per Day', fontsize=12)
     plt.legend()
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    plt.savefig('q4.png', **PNG_OPTIONS)
+    plt.close()
 
 
-def q5_load_forecast(df_demo):
+def q5_load_forecast(agg):
     """
     Q5: Forecast future enrolment/update load.
     Method: Weekly Aggregation + Linear Trend Projection
     """
-    # Resample to Weekly
-    weekly = df_demo.set_index('date').resample('W')[['demo_age_17_']].sum().sum(axis=1)
+    # Resample the daily totals to Weekly
+    weekly = agg['daily_demo']['demo_age_17_'].resample('W').sum()
 
     # Create simple forecast (Avg of last 4 weeks projected forward)
-    last_4_avg = weekly.tail(4).mean()
-    growth_rate = (weekly.iloc[-1] - weekly.iloc[-4]) / weekly.iloc[-4]  # Simple momentum
+    values = weekly.to_numpy()
+    last_4_avg = values[-4:].mean()
+    growth_rate = (values[-1] - values[-4]) / values[-4]  # Simple momentum
 
     # Generate next 12 weeks
     last_date = weekly.index[-1]
-    future_dates = [last_date + timedelta(weeks=x) for x in range(1, 13)]
-    future_vals = [last_4_avg * (1 + (growth_rate * 0.1 * i)) for i in range(1, 13)]  # Conservative growth
+    future_dates = pd.date_range(start=last_date + pd.Timedelta(weeks=1), periods=12, freq='W')
+    future_vals = last_4_avg * (1 + growth_rate * 0.1 * np.arange(1, 13))  # Conservative growth
 
     plt.figure(figsize=(12, 6))
     plt.plot(weekly.index, weekly.values, label='Actual Data (2025)', linewidth=2)
@@ -182,7 +259,8 @@ def q5_load_forecast(df_demo):
     plt.ylabel('Weekly Volume', fontsize=12)
     plt.legend()
     plt.grid(True)
-    plt.show()
+    plt.savefig('q5.png', **PNG_OPTIONS)
+    plt.close()
 
 
 # ==========================================
@@ -192,10 +270,15 @@ if __name__ == "__main__":
     df_e, df_b, df_d = load_and_process_data()
 
     if not df_e.empty:
-        q1_maintenance_gap(df_e, df_b, df_d)
-        q2_compliance_ratio(df_e, df_b)
-        q3_urban_rural_divide(df_b, df_d)
-        q4_load_volatility(df_d)
-        q5_load_forecast(df_d)
+        agg = precompute_aggregates(df_e, df_b, df_d)
+        # Only the aggregates are needed from here on
+        del df_e, df_b, df_d
+        gc.collect()
+
+        q1_maintenance_gap(agg)
+        q2_compliance_ratio(agg)
+        q3_urban_rural_divide(agg)
+        q4_load_volatility(agg)
+        q5_load_forecast(agg)
     else:
         print("❌ Data not found. Please check file paths.")
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Data loading and presentation pieces shared by the UIDAI Streamlit dashboards.
+The loader is cached here once, so every dashboard importing it reuses the same frames.
+"""
+import streamlit as st
+import pandas as pd
+import io
+import os
+import numpy as np
+# pa/pacsv are None without pyarrow
+from uidai_data import (DATASET_DTYPES, STATE_MAP, canonical_labels, combine, files_signature, pa, pacsv,
+                        read_csv_files, scan_dataset_files)
+
+# ==========================================
+# 1. STYLE
+# ==========================================
+# Custom CSS for "Card-like" feel & Typography (Light Theme)
+CUSTOM_CSS = """
+<style>
+    /* Main Background */
+    .stApp {
+        background-color: #ffffff;
+    }
+
+    /* Metric Cards */
+    .metric-card {
+        background-color: #f8f9fa;
+        padding: 20px;
+        border-radius: 10px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+        border-top: 4px solid #ff4b4b;
+        margin-bottom: 20px;
+        color: #31333F;
+    }
+    .metric-card h4 {
+        margin-top: 0;
+        color: #ff4b4b;
+        font-size: 1.1rem;
+    }
+    .metric-card p {
+        font-size: 0.95rem;
+        margin-bottom: 0;
+        color: #555;
+    }
+
+    /* Concept & Statement Boxes */
+    .concept-box {
+        background-color: #e3f2fd;
+        padding: 15px;
+        border-radius: 8px;
+        border-left: 5px solid #2196f3;
+        margin-bottom: 15px;
+        color: #0d47a1;
+    }
+    .insight-box {
+        background-color: #ffebee;
+        padding: 15px;
+        border-radius: 8px;
+        border-left: 5px solid #f44336;
+        margin-bottom: 15px;
+        color: #b71c1c;
+    }
+
+    /* Headers */
+    h1, h2, h3 {
+        color: #2c3e50;
+        font-family: 'Sans-Serif';
+    }
+</style>
+"""
+
+
+# ==========================================
+# 2. DATA LOADING ENGINE (Recursive & Robust)
+# ==========================================
+# Parsed datasets are persisted here so restarts skip CSV parsing
+CACHE_DIR = os.path.join('.cache', 'uidai')
+
+
+# Cached as a resource: the frames are shared across reruns instead of copied out of a pickle
+@st.cache_resource
+def load_data_recursive(cache_dir=CACHE_DIR, dtypes=None):
+    """
+    Robust recursive loader to find UIDAI datasets in any subfolder.
+    dtypes maps each dataset key to its column schema (DATASET_DTYPES by default);
+    Parquet snapshots of the parsed files are kept in cache_dir.
+    Returns the cleaned frames per dataset key, the number of files read for each,
+    and a {path: error message} map of the files that could not be read.
+    """
+    dtypes_by_key = dtypes or DATASET_DTYPES
+
+    # 1. SCAN
+    data_store = scan_dataset_files(os.getcwd())
+    file_log = dict.fromkeys(data_store, 0)
+    failed = {}
+
+    # 2. LOAD & CONCAT
+    final_dfs = {}
+    for key, paths in data_store.items():
+        dtypes = dtypes_by_key[key]
+
+        # Reuse the Parquet snapshot if none of the source files changed
+        cache_path = None
+        if paths:
+            cache_path = os.path.join(cache_dir, f"{key}_{files_signature(paths, dtypes)}.parquet")
+            if os.path.exists(cache_path):
+                try:
+                    final_dfs[key] = pd.read_parquet(cache_path)
+                    # Snapshots are only written when every file was read
+                    file_log[key] = len(paths)
+                    continue
+                except Exception:
+                    pass
+
+        dfs, key_failed = read_csv_files(paths, dtypes) if paths else ([], {})
+        failed.update(key_failed)
+        file_log[key] = len(dfs)
+        final_dfs[key] = combine(dfs) if dfs else pd.DataFrame()
+
+        # A snapshot missing a failed file would hide it until some mtime changes, so none is written
+        if dfs and not key_failed:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                final_dfs[key].to_parquet(cache_path, index=False)
+            except Exception:
+                pass
+
+    # 3. CLEAN & STANDARDIZE
+    for key in final_dfs:
+        df = final_dfs[key]
+        if not df.empty:
+            # Normalize State Names; label columns become categoricals so groupby works on integer codes
+            if 'state' in df.columns:
+                df['state'] = canonical_labels(df['state'], STATE_MAP)
+            if 'district' in df.columns:
+                df['district'] = df['district'].astype('category')
+            # Blank counts were already read as 0, so the int32 columns need no null fill here
+            final_dfs[key] = df
+
+    return final_dfs, file_log, failed
+
+
+# ==========================================
+# 3. PAGE HELPERS
+# ==========================================
+def render_explainer(concept_text, insight_text):
+    """
+    Renders the Concept (Math) and Statement (Insight) boxes side-by-side.
+    """
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown(f"""
+        <div class='concept-box'>
+            <b>📐 Concept (The Methodology)</b><br>
+            {concept_text}
+        </div>
+        """, unsafe_allow_html=True)
+    with c2:
+        st.markdown(f"""
+        <div class='insight-box'>
+            <b>💡 Statement (The Insight)</b><br>
+            {insight_text}
+        </div>
+        """, unsafe_allow_html=True)
+
+
+def render_load_failures(failed):
+    """
+    Warns about the dataset files the loader had to skip, one line per file.
+    """
+    if failed:
+        st.warning(f"⚠️ {len(failed)} dataset file(s) could not be read and were skipped:\n\n"
+                   + "\n".join(f"- `{path}`: {error}" for path, error in sorted(failed.items())))
+
+
+def lttb_indices(y, n_out=1000):
+    """
+    Largest-Triangle-Three-Buckets: positions of the n_out points that best keep the shape of y.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n_out - 2 buckets between the (always kept) first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+def _arrow_csv_table(df):
+    """
+    Arrow table that write_csv renders exactly like DataFrame.to_csv(index=False),
+    or None when some column would be formatted differently.
+    """
+    fields, columns = [], []
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # Labels are only checked on the (few) categories; anything needing quotes goes to pandas
+            cats = s.cat.categories
+            if not pd.api.types.is_string_dtype(cats.dtype) or cats.str.contains('[",\r\n]').any():
+                return None
+            arr = pa.array(s, from_pandas=True).cast(pa.string())
+        elif pd.api.types.is_datetime64_dtype(s.dtype):
+            # pandas writes bare dates only when every value is exactly midnight
+            values = s.to_numpy()
+            if not (values == values.astype('datetime64[D]')).all():
+                return None
+            arr = pa.array(values.astype('datetime64[D]'))
+        elif pd.api.types.is_integer_dtype(s.dtype) and not pd.api.types.is_extension_array_dtype(s.dtype):
+            arr = pa.array(s.to_numpy())
+        else:
+            return None
+        fields.append(str(col))
+        columns.append(arr)
+    return pa.Table.from_arrays(columns, names=fields)
+
+
+def frame_to_csv_bytes(df):
+    """
+    UTF-8 CSV export of a loaded frame, written without an intermediate str copy.
+    Uses Arrow's multithreaded writer when it gives the same bytes, otherwise pandas into one buffer.
+    """
+    table = _arrow_csv_table(df) if pa is not None and len(df.columns) else None
+    if table is not None and not any(ch in name for name in table.column_names for ch in '",\r\n'):
+        # Arrow always quotes header names, so the (plain) header line is written here
+        out = pa.BufferOutputStream()
+        out.write((','.join(table.column_names) + '\n').encode('utf-8'))
+        pacsv.write_csv(table, out, pacsv.WriteOptions(include_header=False, quoting_style='none'))
+        return out.getvalue().to_pybytes()
+
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8')
+    return buf.getvalue()
@@ -0,0 +1,298 @@
+"""
+Streamlit-free loading pieces shared by the UIDAI dashboards and the analysis scripts:
+the dataset schemas, the CSV readers, label cleaning and the on-disk caches.
+"""
+import pandas as pd
+import glob
+import os
+import hashlib
+import warnings
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Prefer Arrow's multithreaded CSV parser; fall back to pandas' C engine without pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pc = pacsv = None
+
+# Column schemas per dataset (declared up front so read_csv skips type inference)
+DATASET_DTYPES = {
+    "enrol": {'state': str, 'district': str, 'pincode': 'int32',
+              'age_0_5': 'int32', 'age_5_17': 'int32', 'age_18_greater': 'int32'},
+    "bio": {'state': str, 'district': str, 'pincode': 'int32',
+            'bio_age_5_17': 'int32', 'bio_age_17_': 'int32'},
+    "demo": {'state': str, 'district': str, 'pincode': 'int32',
+             'demo_age_5_17': 'int32', 'demo_age_17_': 'int32'},
+}
+
+# Known misspellings in the raw state column, mapped to their canonical name
+STATE_MAP = {
+    'Westbengal': 'West Bengal', 'West  Bengal': 'West Bengal',
+    'Uttaranchal': 'Uttarakhand', 'Orissa': 'Odisha',
+    'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra and Nagar Haveli'
+}
+
+# Dataset files look like api_data_aadhar_<kind>_<start>_<end>.csv
+DATASET_PREFIX = 'api_data_aadhar_'
+DATASET_KINDS = {'enrolment': 'enrol', 'biometric': 'bio', 'demographic': 'demo'}
+
+# Directories that never hold datasets (hidden folders are skipped as well)
+SKIP_DIRS = frozenset({'node_modules', '__pycache__', 'venv', 'env'})
+
+def scan_dataset_files(root_dir):
+    """
+    Walks root_dir with os.scandir, pruning hidden and environment folders,
+    and groups matching CSV paths by dataset key.
+    """
+    data_store = {key: [] for key in DATASET_KINDS.values()}
+    stack = [root_dir]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not name.startswith('.') and name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                elif name.endswith('.csv') and name.startswith(DATASET_PREFIX):
+                    key = DATASET_KINDS.get(name[len(DATASET_PREFIX):].split('_', 1)[0])
+                    if key:
+                        data_store[key].append(entry.path)
+    return data_store
+
+
+def files_signature(paths, dtypes):
+    """
+    Short hash of the schema, the sorted file paths and their modification times.
+    """
+    h = hashlib.md5(repr(sorted(dtypes.items(), key=lambda kv: kv[0])).encode())
+    for p in sorted(paths):
+        h.update(f"{p}:{os.path.getmtime(p)}".encode())
+    return h.hexdigest()[:16]
+
+
+def is_label(dtype):
+    """
+    True for the text columns of a schema (plain strings or pandas categoricals).
+    """
+    return dtype is str or dtype == 'category'
+
+
+def _arrow_options(dtypes, with_date):
+    """
+    Arrow equivalent of a dtype schema (categories become dictionary columns).
+    """
+    # Dates arrive as text and are parsed afterwards, so a malformed one becomes null instead of failing the file
+    column_types = {'date': pa.string()}
+    for col, dtype in dtypes.items():
+        if dtype == 'category':
+            column_types[col] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            column_types[col] = pa.string() if dtype is str else pa.int32()
+    return pacsv.ConvertOptions(column_types=column_types,
+                                include_columns=(['date'] if with_date else []) + list(dtypes))
+
+
+def _read_one(path, dtypes, with_date=True):
+    """
+    Parses a single CSV with a fixed schema. Malformed dates become NaT and blank counts 0.
+    Returns an Arrow table when pyarrow is available, otherwise a DataFrame.
+    Raises if the file cannot be read at all.
+    """
+    if pa is not None:
+        table = pacsv.read_csv(path, convert_options=_arrow_options(dtypes, with_date))
+        if not with_date:
+            return table
+        i = table.schema.get_field_index('date')
+        dates = pc.strptime(table.column(i), format='%d-%m-%Y', unit='ns', error_is_null=True)
+        return table.set_column(i, 'date', dates)
+
+    # Counts are read as nullable ints, so blank cells can be filled before narrowing back to int32
+    df = pd.read_csv(path, usecols=(['date'] if with_date else []) + list(dtypes),
+                     dtype={col: dtype if is_label(dtype) else 'Int32' for col, dtype in dtypes.items()})
+    if with_date:
+        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
+    for col, dtype in dtypes.items():
+        if not is_label(dtype):
+            df[col] = df[col].fillna(0).astype(dtype)
+    return df
+
+
+def read_csv_files(paths, dtypes, with_date=True):
+    """
+    Reads the files on parallel threads (both CSV readers release the GIL while parsing).
+    Only the date column (unless with_date is False) and the dtypes columns are parsed.
+    Returns the parsed parts and a {path: error message} map of the files that failed.
+    """
+    def read(path):
+        try:
+            return _read_one(path, dtypes, with_date), None
+        except Exception as exc:
+            return None, f"{type(exc).__name__}: {exc}"
+
+    parts, failed = [], {}
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as ex:
+        for path, (part, error) in zip(paths, ex.map(read, paths)):
+            if error is None:
+                parts.append(part)
+            else:
+                failed[path] = error
+    return parts, failed
+
+
+def combine(parts):
+    """
+    Joins the per-file results into one DataFrame. Arrow tables concatenate by
+    reference, so the only full copy is the final conversion to pandas.
+    """
+    if pa is not None:
+        table = pa.concat_tables(parts)
+        # Null counts are filled inside Arrow so they stay int32 instead of turning float in pandas
+        for i, field in enumerate(table.schema):
+            if pa.types.is_integer(field.type) and table.column(i).null_count:
+                table = table.set_column(i, field, table.column(i).fill_null(0))
+        return table.to_pandas(self_destruct=True, split_blocks=True)
+    return pd.concat(parts, ignore_index=True)
+
+
+def canonical_labels(series, mapping=None):
+    """
+    Returns a categorical copy of a label column with its categories remapped,
+    stripped and title-cased. All string work runs on the unique labels only.
+    """
+    s = series.astype('category')
+    canon = s.cat.categories.to_series()
+    if mapping:
+        canon = canon.replace(mapping)
+    canon = canon.str.strip().str.title()
+
+    # Several raw spellings may collapse onto one label, so remap codes instead of renaming
+    uniq = pd.Index(canon.unique()).sort_values()
+    lookup = np.append(uniq.get_indexer(canon), -1)  # trailing -1 keeps missing values missing
+    codes = lookup[s.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniq), index=series.index, name=series.name)
+
+
+# ==========================================
+# ANALYSIS SCRIPTS (dataset folders under UIDAI_Dataset, Feather cache of the cleaned frames)
+# ==========================================
+DATASET_ROOT = 'UIDAI_Dataset'
+
+# Cleaned frames are cached as Feather (Arrow IPC, so pyarrow is needed) between runs
+FEATHER_DIR = '_cache'
+FEATHER_CACHE = pa is not None
+# Source signature stored next to each Parquet snapshot (the leading '_' keeps Parquet readers off it)
+SNAPSHOT_SIGNATURE = '_source_signature'
+INPUT_PATTERNS = [os.path.join(DATASET_ROOT, f'{DATASET_PREFIX}*', '*.csv'),
+                  os.path.join(DATASET_ROOT, 'parquet', '**', '*.parquet')]
+
+
+def dataset_dtypes(kind, columns=None):
+    """
+    Schema of one dataset by its file kind ('enrolment', 'biometric' or 'demographic'),
+    narrowed to the given columns if any (the date column is not part of the schema).
+    """
+    dtypes = DATASET_DTYPES[DATASET_KINDS[kind]]
+    return dtypes if columns is None else {col: dtypes[col] for col in columns if col != 'date'}
+
+
+def csv_files(kind, root=DATASET_ROOT):
+    """
+    Sorted absolute paths of a dataset's CSV exports, <root>/api_data_aadhar_<kind>/api_data_aadhar_<kind>_*.csv.
+    """
+    pattern = os.path.join(root, f'{DATASET_PREFIX}{kind}', f'{DATASET_PREFIX}{kind}_*.csv')
+    return sorted(os.path.abspath(f) for f in glob.glob(pattern))
+
+
+def source_signature(kind, root=DATASET_ROOT):
+    """
+    Signature of the CSVs (and schema) a Parquet snapshot of the dataset is built from.
+    """
+    return files_signature(csv_files(kind, root), dataset_dtypes(kind))
+
+
+def parquet_snapshot(kind, root=DATASET_ROOT):
+    """
+    Directory of the dataset's Parquet snapshot (written by tools/to_parquet.py) if it is
+    current, otherwise None. A snapshot whose stored source signature no longer matches
+    the CSVs is stale: it is skipped with a warning, so the caller falls back to the CSVs.
+    """
+    parquet_dir = os.path.join(root, 'parquet', kind)
+    if not os.path.isdir(parquet_dir):
+        return None
+    # Without any CSVs there is nothing the snapshot could be behind
+    if not csv_files(kind, root):
+        return parquet_dir
+    try:
+        with open(os.path.join(parquet_dir, SNAPSHOT_SIGNATURE)) as f:
+            stored = f.read().strip()
+    except OSError:
+        stored = None
+    if stored != source_signature(kind, root):
+        warnings.warn(f"{parquet_dir} does not match the current {kind} CSVs; reading the CSVs instead. "
+                      "Rerun tools/to_parquet.py to refresh the snapshot.", stacklevel=2)
+        return None
+    return parquet_dir
+
+
+def load_dataset(kind, columns=None, root=DATASET_ROOT):
+    """
+    Raw rows of one dataset, with only the given columns (all of them by default).
+    Reads the current Parquet snapshot when there is one (see parquet_snapshot),
+    otherwise every CSV file of the dataset. Raises if any CSV file cannot be read.
+    """
+    dtypes = dataset_dtypes(kind, columns)
+    with_date = columns is None or 'date' in columns
+
+    parquet_dir = parquet_snapshot(kind, root)
+    if parquet_dir is not None:
+        return pd.read_parquet(parquet_dir, columns=(['date'] if with_date else []) + list(dtypes))
+
+    files = csv_files(kind, root)
+    if not files:
+        return pd.DataFrame()
+    parts, failed = read_csv_files(files, dtypes, with_date)
+    if failed:
+        raise RuntimeError(f"Could not read {len(failed)} {kind} file(s): "
+                           + "; ".join(f"{path}: {error}" for path, error in sorted(failed.items())))
+    return combine(parts)
+
+
+def cache_key(patterns, script):
+    """
+    Hash of the matching input files' paths and mtimes, plus the mtimes of the calling
+    script and of this module, so editing the data or the cleaning code invalidates the cache.
+    """
+    files = sorted({f for p in patterns for f in glob.glob(p, recursive=True)}
+                   | {os.path.abspath(script), os.path.abspath(__file__)})
+    return hashlib.md5(str([(f, os.path.getmtime(f)) for f in files]).encode()).hexdigest()
+
+
+def load_cached(name, script, kinds, build):
+    """
+    The cleaned frames of a script, one per kind, read from _cache/<name>_<key>_<kind>.feather
+    while its inputs and code are unchanged; otherwise build() makes them and they are cached.
+    Returns the frames and whether they came from the cache.
+    """
+    paths = [os.path.join(FEATHER_DIR, f'{name}_{cache_key(INPUT_PATTERNS, script)}_{kind}.feather')
+             for kind in kinds]
+    if FEATHER_CACHE and all(map(os.path.exists, paths)):
+        return tuple(pd.read_feather(path) for path in paths), True
+
+    frames = build()
+    # An empty frame means missing data, which is not worth keeping
+    if FEATHER_CACHE and not any(df.empty for df in frames):
+        os.makedirs(FEATHER_DIR, exist_ok=True)
+        for kind, df, path in zip(kinds, frames, paths):
+            # Only the current key's file is kept; sets left by earlier keys are removed
+            for stale in glob.glob(os.path.join(FEATHER_DIR, f'{name}_{"[0-9a-f]" * 32}_{kind}.feather')):
+                if stale != path:
+                    os.remove(stale)
+            df.to_feather(path)
+    return frames, False
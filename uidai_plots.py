@@ -0,0 +1,18 @@
+"""
+Plot helpers shared by the figure scripts that draw every plot on one reused Figure.
+Only matplotlib itself is imported, so each script still selects its own backend.
+"""
+import matplotlib
+
+SUBPLOT_PARAMS = ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+
+
+def reset_figure(fig, figsize):
+    """
+    Clears a reused figure, resizes it and restores the default subplot layout,
+    then returns a fresh single Axes to draw the next plot on.
+    """
+    fig.clear()
+    fig.set_size_inches(figsize)
+    fig.subplots_adjust(**{k: matplotlib.rcParams[f'figure.subplot.{k}'] for k in SUBPLOT_PARAMS})
+    return fig.add_subplot()